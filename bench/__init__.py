@@ -0,0 +1 @@
+"""Local benchmarks and stub peers for the relay (not shipped with the service)."""
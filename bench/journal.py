@@ -0,0 +1,167 @@
+"""Ingest rate and query latency of the event journal at a million events.
+
+Usage:
+    python -m bench.journal [--events 1000000] [--mints 50000] [--sources 10]
+        [--queries 200] [--out PATH]
+
+Writes half the events into yesterday's segment (which is then compressed and
+indexed on rotation) and half into today's plain segment, then times `/events`
+style queries by mint, by source, by time and mint+time, plus an unindexed
+scan for the same mint lookup as the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from src.journal import EventJournal
+
+from .stats import summarize_us
+
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+DAY = 86400.0
+
+
+def make_events(
+    n: int, start: float, mints: list[str], sources: list[int], rng: random.Random
+) -> list[dict[str, Any]]:
+    step = DAY / 2 / n
+    events = []
+    for i in range(n):
+        ts = start + i * step
+        events.append(
+            {
+                "ts": datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat()
+                + "Z",
+                "event": "signal_parsed",
+                "message_id": i,
+                "chat_id": rng.choice(sources),
+                "sender_id": 42,
+                "contract_address": rng.choice(mints),
+                "lag_ms": round(rng.uniform(50, 400), 1),
+                "stale": False,
+            }
+        )
+    return events
+
+
+def timed_queries(journal: EventJournal, kwargs_list: list[dict[str, Any]]) -> dict[str, Any]:
+    samples = []
+    blocks = 0
+    found = 0
+    for kwargs in kwargs_list:
+        t0 = time.perf_counter_ns()
+        result = journal.query(**kwargs)
+        samples.append(time.perf_counter_ns() - t0)
+        blocks += result["blocks_scanned"]
+        found += len(result["events"])
+    n = len(kwargs_list)
+    return {
+        **summarize_us(samples),
+        "avg_blocks": round(blocks / n, 1),
+        "avg_events": round(found / n, 1),
+    }
+
+
+def unindexed_lookup(journal: EventJournal, mint: str) -> int:
+    segments = [(day, idx, True) for day, idx in sorted(journal._closed.items())]
+    if journal._day is not None:
+        segments.append((journal._day, journal._active, False))
+    found = 0
+    for day, index, closed in segments:
+        for block in index.blocks:
+            for line in journal._read_block(day, block, closed).splitlines():
+                found += json.loads(line).get("contract_address") == mint
+    return found
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(7)
+    mints = ["".join(rng.choice(BASE58) for _ in range(44)) for _ in range(args.mints)]
+    sources = [-1_000_000_000_000 - rng.randrange(10**9) for _ in range(args.sources)]
+    today = time.time() // DAY * DAY
+    yesterday = today - DAY
+    half = args.events // 2
+    batches = [
+        (yesterday, make_events(half, yesterday, mints, sources, rng)),
+        (today, make_events(args.events - half, today, mints, sources, rng)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        now = [yesterday + DAY / 2]
+        journal = EventJournal(Path(tmp), clock=lambda: now[0])
+        journal.start()
+        append_ns = 0
+        t_start = time.perf_counter()
+        for day_start, events in batches:
+            now[0] = day_start + DAY / 2
+            t0 = time.perf_counter_ns()
+            for event in events:
+                journal.append(event)
+            append_ns += time.perf_counter_ns() - t0
+            journal.flush()
+        ingest_sec = time.perf_counter() - t_start
+        disk = {p.name: p.stat().st_size for p in Path(tmp).iterdir()}
+
+        since_recent = today + DAY / 2 - 600
+        report = {
+            "events": args.events,
+            "ingest": {
+                "events_per_sec": round(args.events / ingest_sec),
+                "append_ns_per_event": round(append_ns / args.events, 1),
+                "seconds": round(ingest_sec, 2),
+            },
+            "disk_bytes": disk,
+            "queries": {
+                "by_mint": timed_queries(
+                    journal, [{"mint": rng.choice(mints)} for _ in range(args.queries)]
+                ),
+                "by_mint_since_10min": timed_queries(
+                    journal,
+                    [
+                        {"mint": rng.choice(mints), "since": since_recent}
+                        for _ in range(args.queries)
+                    ],
+                ),
+                "by_source_limit_100": timed_queries(
+                    journal, [{"source": str(rng.choice(sources))} for _ in range(args.queries)]
+                ),
+                "since_10min_limit_100": timed_queries(
+                    journal, [{"since": since_recent} for _ in range(args.queries)]
+                ),
+            },
+        }
+        # Baseline without the index: decode every block and filter, like grepping logs.
+        t0 = time.perf_counter_ns()
+        matches = unindexed_lookup(journal, rng.choice(mints))
+        report["queries"]["unindexed_by_mint_ms"] = round((time.perf_counter_ns() - t0) / 1e6, 1)
+        report["queries"]["unindexed_matches"] = matches
+        journal.close()
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--mints", type=int, default=50_000, help="distinct mints")
+    parser.add_argument("--sources", type=int, default=10, help="distinct source chats")
+    parser.add_argument("--queries", type=int, default=200, help="queries per kind")
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON report here")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    report = main(cli_args)
+    text = json.dumps(report, indent=2)
+    if cli_args.out is not None:
+        cli_args.out.parent.mkdir(parents=True, exist_ok=True)
+        cli_args.out.write_text(text + "\n")
+    print(text)
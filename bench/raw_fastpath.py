@@ -0,0 +1,170 @@
+"""Per-update cost of the NewMessage event path versus the raw-update fast path.
+
+Usage:
+    python -m bench.raw_fastpath [--updates 20000] [--match-ratio 0.1] [--rounds 5] [--out PATH]
+
+Replays a recorded mix of TL updates (channel posts from the signal source and
+from other chats, plus direct messages) through both paths without a network:
+
+* `newmessage`: what Telethon's dispatcher does for `events.NewMessage(from_users=...)`
+  (build the Event, attach the client, run the builder's filter), followed by the
+  field reads `RelayPipeline.handle` does through the event's lazy properties.
+* `raw`: `RawMessageFilter.extract`, as used by `RelayPipeline.handle_raw`.
+
+Reports ns per update for each path, split into matching and non-matching updates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from telethon import events
+from telethon._updates import EntityCache
+from telethon.tl import types
+
+from src.fastpath import RawMessageFilter, marked_peer_id
+
+from .stats import summarize_us
+
+SOURCE_CHANNEL = 1357911
+SELF_ID = 99
+TEXT = "Signal\nAbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH\nbuy 0.5 SOL"
+
+
+class _StubClient:
+    """Just enough of TelegramClient for Event._set_client without a network."""
+
+    def __init__(self) -> None:
+        self._self_id = SELF_ID
+        self._mb_entity_cache = EntityCache()
+
+
+def recorded_updates(n: int, match_ratio: float, seed: int = 7) -> list[tuple[Any, bool]]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    out: list[tuple[Any, bool]] = []
+    for i in range(n):
+        if rng.random() < match_ratio:
+            channel, match = SOURCE_CHANNEL, True
+        else:
+            channel, match = SOURCE_CHANNEL + 1 + rng.randrange(200), False
+        if not match and rng.random() < 0.3:
+            update: Any = types.UpdateNewMessage(
+                message=types.Message(
+                    id=i,
+                    peer_id=types.PeerUser(1000 + rng.randrange(50)),
+                    date=now,
+                    message=TEXT,
+                ),
+                pts=i,
+                pts_count=1,
+            )
+        else:
+            update = types.UpdateNewChannelMessage(
+                message=types.Message(
+                    id=i, peer_id=types.PeerChannel(channel), date=now, message=TEXT, post=True
+                ),
+                pts=i,
+                pts_count=1,
+            )
+        out.append((update, match))
+    return out
+
+
+def newmessage_path(source_id: int) -> Callable[[Any], Any]:
+    builder = events.NewMessage(from_users=source_id)
+    builder.from_users = {source_id}  # what builder.resolve() leaves behind
+    builder.resolved = True
+    client = _StubClient()
+
+    def handle(update: Any) -> Any:
+        event = events.NewMessage.build(update, None, SELF_ID)
+        if event is None:
+            return None
+        event.original_update = update
+        event._entities = {}
+        event._set_client(client)
+        if not builder.filter(event):
+            return None
+        msg = event.message
+        return (
+            int(msg.id),
+            int(event.chat_id) if getattr(event, "chat_id", None) else None,
+            int(event.sender_id) if getattr(event, "sender_id", None) else None,
+            getattr(msg, "date", None),
+            event.raw_text or "",
+        )
+
+    return handle
+
+
+def raw_path(source_id: int) -> Callable[[Any], Any]:
+    return RawMessageFilter([source_id]).extract
+
+
+def measure(
+    handle: Callable[[Any], Any], updates: list[tuple[Any, bool]], rounds: int
+) -> dict[str, Any]:
+    clock = time.perf_counter_ns
+    samples: dict[bool, list[int]] = {True: [], False: []}
+    accepted = 0
+    for _ in range(rounds):
+        for update, match in updates:
+            t0 = clock()
+            result = handle(update)
+            samples[match].append(clock() - t0)
+            accepted += result is not None
+    all_ns = samples[True] + samples[False]
+    return {
+        "mean_ns": round(sum(all_ns) / len(all_ns), 1),
+        "matching": summarize_us(samples[True]),
+        "non_matching": summarize_us(samples[False]),
+        "accepted": accepted // rounds,
+    }
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    source_id = marked_peer_id(types.PeerChannel(SOURCE_CHANNEL))
+    assert source_id is not None
+    updates = recorded_updates(args.updates, args.match_ratio)
+    expected = sum(match for _, match in updates)
+    report: dict[str, Any] = {
+        "updates": len(updates),
+        "matching": expected,
+        "rounds": args.rounds,
+    }
+    for name, factory in (("newmessage", newmessage_path), ("raw", raw_path)):
+        handle = factory(source_id)
+        measure(handle, updates[:1000], 1)  # warm caches and the allocator
+        result = measure(handle, updates, args.rounds)
+        assert result["accepted"] == expected, (name, result["accepted"], expected)
+        report[name] = result
+    report["speedup"] = round(report["newmessage"]["mean_ns"] / report["raw"]["mean_ns"], 1)
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=20000, help="recorded updates per round")
+    parser.add_argument(
+        "--match-ratio", type=float, default=0.1, help="fraction from the signal source"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON report here")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    report = main(cli_args)
+    text = json.dumps(report, indent=2)
+    if cli_args.out is not None:
+        cli_args.out.parent.mkdir(parents=True, exist_ok=True)
+        cli_args.out.write_text(text + "\n")
+    print(text)
@@ -0,0 +1,166 @@
+"""Per-message cost of rule evaluation with hundreds of rules.
+
+Usage:
+    python -m bench.rules_eval [--rules 300] [--messages 5000] [--rounds 3] [--out PATH]
+
+Generates a rule set (keywords, phrases, regexes, sender allowlists, a few
+excludes) and a mix of signal cards and chatter, then times
+`RulesEngine.evaluate` against a naive loop that runs each rule's own regex
+in turn. Both must agree on every pass/drop decision.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from src.rules import RulesEngine
+
+from .stats import summarize_us
+
+SOURCE_ID = -1001234
+WORDS = [f"tok{i}" for i in range(2000)]
+CARD = "\n".join(
+    [
+        "SURVIVE THE STREETS #SURVIVE",
+        "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH",
+        "MC: $76.3K | Liq: $17.9K",
+        "Holders: 223 | Txns: 790",
+        "Bundled: 7.0% | Snipers: 36.0%",
+    ]
+)
+
+
+def build_rules(n: int, rng: random.Random) -> dict[str, Any]:
+    rules: list[dict[str, Any]] = [
+        {"name": "rug", "action": "exclude", "keywords": ["rug", "rugged", "sell now"]},
+        {"name": "honeypot", "action": "exclude", "patterns": [r"honey\s*pot"]},
+    ]
+    for i in range(n - len(rules)):
+        kind = i % 4
+        rule: dict[str, Any] = {"name": f"r{i}"}
+        if kind == 0:
+            rule["keywords"] = rng.sample(WORDS, 3)
+        elif kind == 1:
+            rule["keywords"] = [f"{rng.choice(WORDS)} {rng.choice(WORDS)}"]
+        elif kind == 2:
+            rule["patterns"] = [rf"{rng.choice(WORDS)}\d{{2,4}}"]
+        else:
+            rule["keywords"] = [rng.choice(WORDS)]
+            rule["senders"] = [rng.randrange(1, 50)]
+        if i % 10 == 0:
+            rule["side"] = "buy" if i % 20 == 0 else "sell"
+        rules.append(rule)
+    return {"sources": {str(SOURCE_ID): rules}}
+
+
+def build_messages(n: int, rng: random.Random) -> list[tuple[str, int]]:
+    out = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.3:
+            text = CARD + "\n" + " ".join(rng.sample(WORDS, 4))
+        elif roll < 0.4:
+            text = "careful, this one rugged " + rng.choice(WORDS)
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(5, 30)))
+        out.append((text, rng.randrange(1, 60)))
+    return out
+
+
+def naive_evaluator(data: dict[str, Any]) -> Callable[[str, int], bool]:
+    """One compiled regex per rule, tried in order: the obvious implementation."""
+    compiled = []
+    for rule in data["sources"][str(SOURCE_ID)]:
+        alts = [re.escape(k).join((r"(?<!\w)", r"(?!\w)")) for k in rule.get("keywords", ())]
+        alts += rule.get("patterns", [])
+        pattern = re.compile("|".join(alts), re.IGNORECASE)
+        senders = set(rule["senders"]) if "senders" in rule else None
+        compiled.append((rule.get("action", "include"), pattern, senders))
+
+    def evaluate(text: str, sender_id: int) -> bool:
+        included = False
+        for action, pattern, senders in compiled:
+            if senders is not None and sender_id not in senders:
+                continue
+            if pattern.search(text):
+                if action == "exclude":
+                    return False
+                included = included or action == "include"
+        return included
+
+    return evaluate
+
+
+def measure(
+    evaluate: Callable[[str, int], bool], messages: list[tuple[str, int]], rounds: int
+) -> tuple[dict[str, Any], list[bool]]:
+    clock = time.perf_counter_ns
+    samples: list[int] = []
+    decisions: list[bool] = []
+    for _ in range(rounds):
+        decisions = []
+        for text, sender in messages:
+            t0 = clock()
+            decisions.append(evaluate(text, sender))
+            samples.append(clock() - t0)
+    return (
+        {"mean_ns": round(sum(samples) / len(samples), 1), **summarize_us(samples)},
+        decisions,
+    )
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    data = build_rules(args.rules, rng)
+    messages = build_messages(args.messages, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rules.json"
+        path.write_text(json.dumps(data))
+        t0 = time.perf_counter_ns()
+        engine = RulesEngine(str(path))
+        compile_ms = (time.perf_counter_ns() - t0) / 1e6
+
+    compiled, decisions = measure(
+        lambda text, sender: engine.evaluate(SOURCE_ID, sender, text).allowed,
+        messages,
+        args.rounds,
+    )
+    naive, expected = measure(naive_evaluator(data), messages, args.rounds)
+    assert decisions == expected, "compiled and naive evaluators disagree"
+    return {
+        "rules": args.rules,
+        "messages": args.messages,
+        "rounds": args.rounds,
+        "compile_ms": round(compile_ms, 2),
+        "passed": sum(decisions),
+        "compiled": compiled,
+        "naive": naive,
+        "speedup": round(naive["mean_ns"] / compiled["mean_ns"], 1),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON report here")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    report = main(cli_args)
+    text = json.dumps(report, indent=2)
+    if cli_args.out is not None:
+        cli_args.out.parent.mkdir(parents=True, exist_ok=True)
+        cli_args.out.write_text(text + "\n")
+    print(text)
@@ -0,0 +1,115 @@
+"""Compare per-event delivery latency of the HTTP webhook, UDS and mmap ring sinks.
+
+Usage: python -m bench.sink_latency [--events N] [--warmup N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import time
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any
+
+from src.sinks.shm_ring import MmapRing, RingSink
+from src.sinks.uds import UnixSocketSink
+from src.sinks.webhook import WebhookSink
+
+from .stats import summarize_us
+from .stubs import StubHttpExecutor, StubUdsConsumer
+
+PAYLOAD: dict[str, Any] = {
+    "ts": "2025-01-01T00:00:00Z",
+    "event": "signal_parsed",
+    "message_id": 1,
+    "chat_id": -1001234567890,
+    "sender_id": 42,
+    "contract_address": "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH",
+}
+
+
+async def _time_emits(sink: Any, events: int, warmup: int) -> list[int]:
+    for _ in range(warmup):
+        await sink.emit(PAYLOAD)
+    samples: list[int] = []
+    for i in range(events):
+        payload = dict(PAYLOAD, message_id=i)
+        t0 = time.perf_counter_ns()
+        await sink.emit(payload)
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+async def bench_webhook(events: int, warmup: int) -> list[int]:
+    stub = StubHttpExecutor()
+    await stub.start()
+    sink = WebhookSink(stub.url, secret="bench", timeout_ms=1000)
+    try:
+        return await _time_emits(sink, events, warmup)
+    finally:
+        await sink.aclose()
+        await stub.stop()
+
+
+async def bench_uds(events: int, warmup: int, tmp: Path) -> list[int]:
+    consumer = StubUdsConsumer(str(tmp / "relay.sock"))
+    await consumer.start()
+    sink = UnixSocketSink(consumer.path, timeout_ms=1000)
+    try:
+        return await _time_emits(sink, events, warmup)
+    finally:
+        await sink.aclose()
+        await consumer.stop()
+
+
+def _ring_consumer(path: str, total: int, out: Connection) -> None:
+    reader = MmapRing.open(path)
+    latencies: list[int] = []
+    while len(latencies) < total:
+        body = reader.read()
+        if body is None:
+            continue
+        latencies.append(time.perf_counter_ns() - json.loads(body)["sent_ns"])
+    reader.close()
+    out.send(latencies)
+
+
+async def bench_ring(events: int, warmup: int, tmp: Path) -> list[int]:
+    """Producer-to-consumer hand-off latency with a busy-polling consumer process."""
+    path = str(tmp / "relay.ring")
+    sink = RingSink(path, size_bytes=1 << 20)
+    total = events + warmup
+    recv, send = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(target=_ring_consumer, args=(path, total, send))
+    proc.start()
+    for i in range(total):
+        await sink.emit(dict(PAYLOAD, message_id=i, sent_ns=time.perf_counter_ns()))
+        # Pace the producer so samples reflect hand-off latency rather than queueing.
+        await asyncio.sleep(0.0002)
+    latencies: list[int] = await asyncio.to_thread(recv.recv)
+    proc.join()
+    await sink.aclose()
+    return latencies[warmup:]
+
+
+async def main(events: int, warmup: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        return {
+            "events": events,
+            "webhook_http": summarize_us(await bench_webhook(events, warmup)),
+            "uds_stream": summarize_us(await bench_uds(events, warmup, tmp)),
+            "mmap_ring": summarize_us(await bench_ring(events, warmup, tmp)),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.events, args.warmup)), indent=2))
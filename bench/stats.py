@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sample list (q in 0..100)."""
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, int(round(q / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[idx]
+
+
+def summarize_us(samples_ns: list[int]) -> dict[str, float]:
+    """p50/p99/p999/max in microseconds for a list of nanosecond durations."""
+    ordered = sorted(s / 1000.0 for s in samples_ns)
+    return {
+        "n": float(len(ordered)),
+        "p50_us": round(percentile(ordered, 50), 1),
+        "p99_us": round(percentile(ordered, 99), 1),
+        "p999_us": round(percentile(ordered, 99.9), 1),
+        "max_us": round(ordered[-1], 1) if ordered else 0.0,
+    }
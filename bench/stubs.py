@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import random
+from typing import Any, Callable
+
+from src.sinks.uds import ACK_OK, read_frame
+
+FrameHandler = Callable[[dict[str, Any]], None]
+
+_RESPONSE_202 = (
+    b"HTTP/1.1 202 Accepted\r\ncontent-type: application/json\r\ncontent-length: 2\r\n\r\n{}"
+)
+_RESPONSE_500 = b"HTTP/1.1 500 Internal Server Error\r\ncontent-length: 0\r\n\r\n"
+
+
+class StubUdsConsumer:
+    """Minimal executor-side peer for UnixSocketSink: reads frames and acks each one."""
+
+    def __init__(self, path: str, on_event: FrameHandler | None = None) -> None:
+        self.path = path
+        self.on_event = on_event
+        self.received: list[dict[str, Any]] = []
+        self._server: asyncio.AbstractServer | None = None
+        self._conns: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._conns.add(writer)
+        try:
+            while True:
+                body = await read_frame(reader)
+                event = json.loads(body)
+                self.received.append(event)
+                if self.on_event is not None:
+                    self.on_event(event)
+                writer.write(ACK_OK)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._conns.discard(writer)
+            writer.close()
+
+    async def stop(self) -> None:
+        # Drop live connections too, like a consumer process exiting would.
+        for writer in list(self._conns):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+
+class StubHttpExecutor:
+    """Keep-alive HTTP/1.1 stub that accepts any POST with 202 after `latency_ms`.
+
+    `error_rate` answers that fraction of requests with 500; `drop_rate` closes
+    the connection without answering, which the webhook sink sees as an error.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        *,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.received = 0
+        self.errors = 0
+        self.drops = 0
+        self._rng = random.Random(seed)
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/events/trade"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000.0)
+                self.received += 1
+                roll = self._rng.random()
+                if roll < self.drop_rate:
+                    self.drops += 1
+                    return
+                if roll < self.drop_rate + self.error_rate:
+                    self.errors += 1
+                    writer.write(_RESPONSE_500)
+                    continue
+                writer.write(_RESPONSE_202)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
@@ -0,0 +1,70 @@
+"""Per-call cost of `log_event` when the line is written versus filtered.
+
+Usage:
+    python -m bench.telemetry [--calls 200000] [--out PATH]
+
+Writes go to an in-memory stream so the numbers are formatting cost only; a
+real stdout pipe is slower still. Each filtered path (below LOG_LEVEL,
+sampled out, rate limited) should cost a small fraction of a written line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from src.telemetry import Telemetry
+
+FIELDS = {"message_id": 123456, "chat_id": -1001234567890, "error": "boom", "lag_ms": 41.7}
+
+
+def ns_per_call(tel: Telemetry, event: str, level: str, calls: int) -> float:
+    log = tel.log
+    t0 = time.perf_counter_ns()
+    for _ in range(calls):
+        log(event, level, dict(FIELDS))
+    return round((time.perf_counter_ns() - t0) / calls, 1)
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    calls = args.calls
+    results = {
+        "written": ns_per_call(Telemetry(stream=io.StringIO()), "handler_error", "error", calls),
+        "below_level": ns_per_call(
+            Telemetry(level="warning", stream=io.StringIO()), "signal_event", "info", calls
+        ),
+        "sampled_out": ns_per_call(
+            Telemetry(sample_rate=0.0, sampled_events=["signal_event"], stream=io.StringIO()),
+            "signal_event",
+            "info",
+            calls,
+        ),
+        "rate_limited": ns_per_call(
+            Telemetry(rate_per_sec=20, burst=50, stream=io.StringIO()),
+            "handler_error",
+            "error",
+            calls,
+        ),
+    }
+    return {"calls": calls, "ns_per_call": results}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON report here")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    report = main(cli_args)
+    text = json.dumps(report, indent=2)
+    if cli_args.out is not None:
+        cli_args.out.parent.mkdir(parents=True, exist_ok=True)
+        cli_args.out.write_text(text + "\n")
+    print(text)
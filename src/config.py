@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import dataclasses
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .telemetry import LEVELS
+
+# Accepted values for the enumerated settings; the components import them from here.
+STALE_ACTIONS = ("drop", "downgrade", "tag")
+TG_FORWARD_MODES = ("repost", "forward")
+EVENT_UDS_MODES = ("stream", "ring")
 
 
 def _get_bool(env: str, default: bool) -> bool:
@@ -18,6 +27,33 @@ def _get_int(env: str, default: int) -> int:
     return int(val)
 
 
+def _get_float(env: str, default: float) -> float:
+    val = os.environ.get(env)
+    if val is None or val.strip() == "":
+        return default
+    return float(val)
+
+
+def _get_list(env: str, default: list[str]) -> list[str]:
+    val = os.environ.get(env)
+    if val is None:
+        return list(default)
+    return [item.strip() for item in val.split(",") if item.strip()]
+
+
+def _get_chats(env: str) -> list[int | str]:
+    """Comma-separated chat IDs or usernames; numeric entries become ints."""
+    chats: list[int | str] = []
+    for item in (os.environ.get(env) or "").split(","):
+        item = item.strip()
+        if item:
+            chats.append(int(item) if item.lstrip("-").isdigit() else item)
+    return chats
+
+
+DEFAULT_SAMPLED_EVENTS = ("signal_event", "stale_dropped")
+
+
 @dataclass
 class Config:
     # Telegram
@@ -28,6 +64,14 @@ class Config:
 
     # Behavior
     dry_run: bool = True
+    # Freshness: events older than this (after skew correction) are stale; 0 disables.
+    signal_max_age_ms: int = 15000
+    signal_stale_action: str = "tag"  # drop | downgrade | tag
+    # Pick up CAs edited into already-seen messages; tracks this many recent messages
+    signal_handle_edits: bool = True
+    signal_edit_cache_size: int = 512
+    # JSON rule file gating messages before emit (see rules.py); reloaded on change
+    rules_file: str | None = None
 
     # Sinks
     event_sink_stdout: bool = True
@@ -35,15 +79,70 @@ class Config:
     event_webhook_secret: str | None = None
     event_webhook_timeout_ms: int = 1500
     event_webhook_max_retries: int = 2
+    # Co-located executor: Unix socket stream or mmap'd ring file at this path
+    event_uds_path: str | None = None
+    event_uds_mode: str = "stream"
+    event_uds_timeout_ms: int = 500
+    event_uds_max_retries: int = 2
+    event_ring_size_bytes: int = 4 << 20
+    # Replaced sinks get this long to finish in-flight sends before being closed
+    sink_drain_timeout_ms: int = 5000
+    # Per best-effort sink backlog; events beyond this are dropped and counted
+    sink_lane_queue_size: int = 1000
+    # On shutdown, in-flight handlers and sink queues get this long to finish;
+    # anything left is spilled to STATE_DIR/spill.jsonl and replayed on start
+    shutdown_drain_timeout_ms: int = 10000
+    # On start, spilled events are replayed for at most this long (new signals
+    # wait behind them); the rest stay spilled for the next start
+    spill_replay_timeout_ms: int = 10000
+    # Telegram output: repost or forward signals to these chats (IDs or usernames)
+    tg_forward_chats: list[int | str] = field(default_factory=list)
+    tg_forward_mode: str = "repost"  # repost | forward
+    tg_forward_min_interval_ms: int = 1000
+    tg_forward_max_batch: int = 10
+    tg_forward_queue_size: int = 200
+
+    # Reload config when this file (typically .env) changes; unset disables watching
+    config_watch_file: str | None = None
+    config_watch_interval_ms: int = 2000
+
+    # Mint metadata enrichment before emit; unset URL disables the stage
+    enrich_url: str | None = None
+    enrich_budget_ms: int = 150
+    enrich_timeout_ms: int = 1000
+    enrich_ttl_sec: int = 300
+    enrich_negative_ttl_sec: int = 30
+    enrich_cache_size: int = 4096
 
     # Status server
     status_http_enabled: bool = True
     status_http_host: str = "127.0.0.1"
     status_http_port: int = 8787
+    # Loop lag heartbeat period and how long it may go silent before a stall is logged
+    loop_monitor_interval_ms: int = 100
+    loop_stall_ms: int = 100
+    # GET /debug/profile on the status server (unauthenticated: opt in)
+    debug_profile_enabled: bool = False
+    # /healthz and /readyz: probe period, the executor's own health URL (optional)
+    # and the max age of the last source update for readiness (0: report only)
+    health_probe_interval_ms: int = 5000
+    executor_healthz_url: str | None = None
+    ready_max_update_age_sec: int = 0
+
+    # Logging: threshold, per-event-name rate limit (0 disables) and sampling of
+    # high-volume info events; suppressed counts are summarized periodically
+    log_level: str = "info"
+    log_rate_per_sec: float = 20.0
+    log_burst: int = 50
+    log_sample_rate: float = 1.0
+    log_sampled_events: list[str] = field(default_factory=lambda: list(DEFAULT_SAMPLED_EVENTS))
 
     # Persistence
     state_dir: str = "./state"
     state_last_seen_file: str = "last_seen.json"
+    # Every emitted event goes to STATE_DIR/journal (queryable via /events)
+    journal_enabled: bool = True
+    journal_retention_days: int = 30
 
     # Telegram client identity (helps avoid UPDATE_APP_TO_LOGIN)
     tg_device_model: str = "iPhone 16 Pro"
@@ -51,6 +150,8 @@ class Config:
     tg_app_version: str = "auto"
     tg_lang_code: str = "en"
     tg_system_lang_code: str = "en"
+    # Handle raw UpdateNewMessage-style updates instead of NewMessage events
+    tg_raw_fastpath: bool = False
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -72,32 +173,106 @@ class Config:
         except Exception as exc:  # pragma: no cover
             raise ValueError("SIGNAL_SOURCE_ID must be an integer") from exc
 
-        return cls(
+        cfg = cls(
             api_id=api_id,
             api_hash=os.environ["API_HASH"],
             session_name=os.environ.get("SESSION_NAME", "spare_tg_user"),
             signal_source_id=signal_source_id,
             dry_run=_get_bool("DRY_RUN", True),
+            signal_max_age_ms=_get_int("SIGNAL_MAX_AGE_MS", 15000),
+            signal_stale_action=os.environ.get("SIGNAL_STALE_ACTION", "tag").strip().lower(),
+            signal_handle_edits=_get_bool("SIGNAL_HANDLE_EDITS", True),
+            signal_edit_cache_size=_get_int("SIGNAL_EDIT_CACHE_SIZE", 512),
+            rules_file=(os.environ.get("RULES_FILE") or "") or None,
             event_sink_stdout=_get_bool("EVENT_SINK_STDOUT", True),
             event_webhook_url=(os.environ.get("EVENT_WEBHOOK_URL") or "") or None,
             event_webhook_secret=(os.environ.get("EVENT_WEBHOOK_SECRET") or "") or None,
             event_webhook_timeout_ms=_get_int("EVENT_WEBHOOK_TIMEOUT_MS", 1500),
             event_webhook_max_retries=_get_int("EVENT_WEBHOOK_MAX_RETRIES", 2),
+            event_uds_path=(os.environ.get("EVENT_UDS_PATH") or "") or None,
+            event_uds_mode=os.environ.get("EVENT_UDS_MODE", "stream").strip().lower(),
+            event_uds_timeout_ms=_get_int("EVENT_UDS_TIMEOUT_MS", 500),
+            event_uds_max_retries=_get_int("EVENT_UDS_MAX_RETRIES", 2),
+            event_ring_size_bytes=_get_int("EVENT_RING_SIZE_BYTES", 4 << 20),
+            sink_drain_timeout_ms=_get_int("SINK_DRAIN_TIMEOUT_MS", 5000),
+            sink_lane_queue_size=_get_int("SINK_LANE_QUEUE_SIZE", 1000),
+            shutdown_drain_timeout_ms=_get_int("SHUTDOWN_DRAIN_TIMEOUT_MS", 10000),
+            spill_replay_timeout_ms=_get_int("SPILL_REPLAY_TIMEOUT_MS", 10000),
+            tg_forward_chats=_get_chats("TG_FORWARD_CHATS"),
+            tg_forward_mode=os.environ.get("TG_FORWARD_MODE", "repost").strip().lower(),
+            tg_forward_min_interval_ms=_get_int("TG_FORWARD_MIN_INTERVAL_MS", 1000),
+            tg_forward_max_batch=_get_int("TG_FORWARD_MAX_BATCH", 10),
+            tg_forward_queue_size=_get_int("TG_FORWARD_QUEUE_SIZE", 200),
+            config_watch_file=(os.environ.get("CONFIG_WATCH_FILE") or "") or None,
+            config_watch_interval_ms=_get_int("CONFIG_WATCH_INTERVAL_MS", 2000),
+            enrich_url=(os.environ.get("ENRICH_URL") or "") or None,
+            enrich_budget_ms=_get_int("ENRICH_BUDGET_MS", 150),
+            enrich_timeout_ms=_get_int("ENRICH_TIMEOUT_MS", 1000),
+            enrich_ttl_sec=_get_int("ENRICH_TTL_SEC", 300),
+            enrich_negative_ttl_sec=_get_int("ENRICH_NEGATIVE_TTL_SEC", 30),
+            enrich_cache_size=_get_int("ENRICH_CACHE_SIZE", 4096),
             status_http_enabled=_get_bool("STATUS_HTTP_ENABLED", True),
             status_http_host=os.environ.get("STATUS_HTTP_HOST", "127.0.0.1"),
             status_http_port=_get_int("STATUS_HTTP_PORT", 8787),
+            loop_monitor_interval_ms=_get_int("LOOP_MONITOR_INTERVAL_MS", 100),
+            loop_stall_ms=_get_int("LOOP_STALL_MS", 100),
+            debug_profile_enabled=_get_bool("DEBUG_PROFILE_ENABLED", False),
+            health_probe_interval_ms=_get_int("HEALTH_PROBE_INTERVAL_MS", 5000),
+            executor_healthz_url=(os.environ.get("EXECUTOR_HEALTHZ_URL") or "") or None,
+            ready_max_update_age_sec=_get_int("READY_MAX_UPDATE_AGE_SEC", 0),
+            log_level=os.environ.get("LOG_LEVEL", "info").strip().lower(),
+            log_rate_per_sec=_get_float("LOG_RATE_PER_SEC", 20.0),
+            log_burst=_get_int("LOG_BURST", 50),
+            log_sample_rate=_get_float("LOG_SAMPLE_RATE", 1.0),
+            log_sampled_events=_get_list("LOG_SAMPLED_EVENTS", list(DEFAULT_SAMPLED_EVENTS)),
             state_dir=os.environ.get("STATE_DIR", "./state"),
             state_last_seen_file=os.environ.get("STATE_LAST_SEEN_FILE", "last_seen.json"),
+            journal_enabled=_get_bool("JOURNAL_ENABLED", True),
+            journal_retention_days=_get_int("JOURNAL_RETENTION_DAYS", 30),
             tg_device_model=os.environ.get("TG_DEVICE_MODEL", "iPhone 16 Pro"),
             tg_system_version=os.environ.get("TG_SYSTEM_VERSION", "iOS 18.0"),
             tg_app_version=os.environ.get("TG_APP_VERSION", "auto"),
             tg_lang_code=os.environ.get("TG_LANG_CODE", "en"),
             tg_system_lang_code=os.environ.get("TG_SYSTEM_LANG_CODE", "en"),
+            tg_raw_fastpath=_get_bool("TG_RAW_FASTPATH", False),
+        )
+        cfg.validate()
+        return cfg
+
+    def validate(self) -> None:
+        """Reject values that components would only refuse once half a reload is applied."""
+        choices: tuple[tuple[str, str, tuple[str, ...]], ...] = (
+            ("SIGNAL_STALE_ACTION", self.signal_stale_action, STALE_ACTIONS),
+            ("TG_FORWARD_MODE", self.tg_forward_mode, TG_FORWARD_MODES),
+            ("EVENT_UDS_MODE", self.event_uds_mode, EVENT_UDS_MODES),
+            ("LOG_LEVEL", self.log_level, tuple(LEVELS)),
         )
+        for env, value, allowed in choices:
+            if value not in allowed:
+                raise ValueError(f"{env} must be one of {', '.join(allowed)}, got {value!r}")
 
-    def hot_reload(self) -> None:
-        """Reload only hot-reloadable fields from the environment."""
+    def hot_reload(self, check: Callable[[Config], None] | None = None) -> None:
+        """Reload only hot-reloadable fields from the environment.
+
+        All-or-nothing: on an invalid value this raises ValueError and leaves
+        every field as it was, before any sink or pipeline state is touched.
+        `check` vets the staged config too (e.g. that its rule file loads) and
+        rejects the reload by raising ValueError.
+        """
+        staged = dataclasses.replace(self)
+        staged._read_hot_fields()
+        staged.validate()
+        if check is not None:
+            check(staged)
+        self.__dict__.update(staged.__dict__)
+
+    def _read_hot_fields(self) -> None:
         self.dry_run = _get_bool("DRY_RUN", self.dry_run)
+        self.signal_max_age_ms = _get_int("SIGNAL_MAX_AGE_MS", self.signal_max_age_ms)
+        self.signal_stale_action = (
+            os.environ.get("SIGNAL_STALE_ACTION", self.signal_stale_action).strip().lower()
+        )
+        self.rules_file = (os.environ.get("RULES_FILE") or "") or None
         self.event_sink_stdout = _get_bool("EVENT_SINK_STDOUT", self.event_sink_stdout)
         self.event_webhook_url = (os.environ.get("EVENT_WEBHOOK_URL") or "") or None
         self.event_webhook_secret = (os.environ.get("EVENT_WEBHOOK_SECRET") or "") or None
@@ -107,6 +282,30 @@ class Config:
         self.event_webhook_max_retries = _get_int(
             "EVENT_WEBHOOK_MAX_RETRIES", self.event_webhook_max_retries
         )
+        self.event_uds_path = (os.environ.get("EVENT_UDS_PATH") or "") or None
+        self.event_uds_mode = os.environ.get("EVENT_UDS_MODE", self.event_uds_mode).strip().lower()
+        self.event_uds_timeout_ms = _get_int("EVENT_UDS_TIMEOUT_MS", self.event_uds_timeout_ms)
+        self.event_uds_max_retries = _get_int("EVENT_UDS_MAX_RETRIES", self.event_uds_max_retries)
+        self.event_ring_size_bytes = _get_int("EVENT_RING_SIZE_BYTES", self.event_ring_size_bytes)
+        self.sink_drain_timeout_ms = _get_int("SINK_DRAIN_TIMEOUT_MS", self.sink_drain_timeout_ms)
+        self.shutdown_drain_timeout_ms = _get_int(
+            "SHUTDOWN_DRAIN_TIMEOUT_MS", self.shutdown_drain_timeout_ms
+        )
+        self.tg_forward_chats = _get_chats("TG_FORWARD_CHATS")
+        self.tg_forward_mode = (
+            os.environ.get("TG_FORWARD_MODE", self.tg_forward_mode).strip().lower()
+        )
+        self.tg_forward_min_interval_ms = _get_int(
+            "TG_FORWARD_MIN_INTERVAL_MS", self.tg_forward_min_interval_ms
+        )
+        self.tg_forward_max_batch = _get_int("TG_FORWARD_MAX_BATCH", self.tg_forward_max_batch)
+        self.tg_forward_queue_size = _get_int("TG_FORWARD_QUEUE_SIZE", self.tg_forward_queue_size)
+        self.enrich_budget_ms = _get_int("ENRICH_BUDGET_MS", self.enrich_budget_ms)
         self.status_http_enabled = _get_bool("STATUS_HTTP_ENABLED", self.status_http_enabled)
         self.status_http_host = os.environ.get("STATUS_HTTP_HOST", self.status_http_host)
         self.status_http_port = _get_int("STATUS_HTTP_PORT", self.status_http_port)
+        self.log_level = os.environ.get("LOG_LEVEL", self.log_level).strip().lower()
+        self.log_rate_per_sec = _get_float("LOG_RATE_PER_SEC", self.log_rate_per_sec)
+        self.log_burst = _get_int("LOG_BURST", self.log_burst)
+        self.log_sample_rate = _get_float("LOG_SAMPLE_RATE", self.log_sample_rate)
+        self.log_sampled_events = _get_list("LOG_SAMPLED_EVENTS", self.log_sampled_events)
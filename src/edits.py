@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from .parser import parse_mints
+
+
+class EditTracker:
+    """Remembers recent messages so edits only surface mints that are new.
+
+    Entries are keyed by (source, message_id) and hold a hash of the last text
+    seen plus every mint already accounted for in that message, which makes
+    (source, message_id, mint) the dedupe key for edits. Edits that leave the
+    text unchanged (reactions, view counts, link previews) never reach the
+    parser. The oldest entries are evicted past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, int], tuple[int, set[str]]] = OrderedDict()
+        self.counters: dict[str, int] = {
+            "edits": 0,
+            "unchanged": 0,
+            "untracked": 0,
+            "new_mints": 0,
+        }
+
+    def tracks(self, source_id: int, message_id: int) -> bool:
+        return (source_id, message_id) in self._entries
+
+    def remember(
+        self, source_id: int, message_id: int, text: str, mints: Iterable[str] | None = None
+    ) -> None:
+        """Record a freshly processed message and the mints accounted for.
+
+        `mints` defaults to every mint in `text`; pass the ones actually
+        emitted so an edit can still surface the rest.
+        """
+        key = (source_id, message_id)
+        known = set(parse_mints(text) if mints is None else mints)
+        self._entries[key] = (hash(text), known)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def new_mints(self, source_id: int, message_id: int, text: str) -> list[str]:
+        """Mints in an edited text that the message has not carried before.
+
+        The caller must check `tracks` first.
+        """
+        key = (source_id, message_id)
+        text_hash, known = self._entries[key]
+        self._entries.move_to_end(key)
+        self.counters["edits"] += 1
+        if text_hash == hash(text):
+            self.counters["unchanged"] += 1
+            return []
+        fresh = [m for m in parse_mints(text) if m not in known]
+        known.update(fresh)
+        self._entries[key] = (hash(text), known)
+        self.counters["new_mints"] += len(fresh)
+        return fresh
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.counters, "tracked": len(self._entries)}
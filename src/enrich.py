@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from .metrics import LatencyWindow
+from .telemetry import log_event
+
+# Returns mint metadata (symbol, liquidity, created_at, ...) or None if unknown.
+MintFetcher = Callable[[str], Awaitable[dict[str, Any] | None]]
+
+
+class HttpMintFetcher:
+    """GET `{base_url}/{mint}` on a pooled client; 404 means unknown mint."""
+
+    def __init__(self, base_url: str, timeout_ms: int = 1000) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(timeout=timeout_ms / 1000.0)
+
+    async def __call__(self, mint: str) -> dict[str, Any] | None:
+        response = await self._client.get(f"{self.base_url}/{mint}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        return data if isinstance(data, dict) else None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class MintEnricher:
+    """Single-flight, LRU+TTL cached mint metadata lookups with a per-event budget.
+
+    Concurrent lookups for the same mint share one fetch. Unknown mints and
+    failed fetches are cached for `negative_ttl_sec`. A caller waits at most
+    `budget_ms`; the fetch keeps running in the background so the next event for
+    that mint finds it cached.
+    """
+
+    def __init__(
+        self,
+        fetch: MintFetcher,
+        *,
+        ttl_sec: float = 300.0,
+        negative_ttl_sec: float = 30.0,
+        max_entries: int = 4096,
+        budget_ms: int = 150,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl = ttl_sec
+        self.negative_ttl = negative_ttl_sec
+        self.max_entries = max_entries
+        self.budget = budget_ms / 1000.0
+        # mint -> (expires_at monotonic, value)
+        self._cache: OrderedDict[str, tuple[float, dict[str, Any] | None]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[dict[str, Any] | None]] = {}
+        self.counters: dict[str, int] = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+        self.added_latency = LatencyWindow()
+
+    async def enrich(self, mint: str) -> dict[str, Any] | None:
+        t0 = time.perf_counter_ns()
+        try:
+            return await self._lookup(mint)
+        finally:
+            self.added_latency.record(time.perf_counter_ns() - t0)
+
+    async def _lookup(self, mint: str) -> dict[str, Any] | None:
+        entry = self._cache.get(mint)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(mint)
+                self.counters["hits" if value is not None else "negative_hits"] += 1
+                return value
+            del self._cache[mint]
+
+        task = self._inflight.get(mint)
+        if task is None:
+            self.counters["misses"] += 1
+            task = asyncio.create_task(self._fetch(mint))
+            self._inflight[mint] = task
+        else:
+            self.counters["coalesced"] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.budget)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            return None
+
+    async def _fetch(self, mint: str) -> dict[str, Any] | None:
+        value: dict[str, Any] | None = None
+        try:
+            value = await self.fetch(mint)
+        except Exception as exc:
+            self.counters["errors"] += 1
+            log_event("enrich_fetch_failed", level="warning", mint=mint, error=str(exc))
+        finally:
+            self._inflight.pop(mint, None)
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self._cache[mint] = (time.monotonic() + ttl, value)
+        self._cache.move_to_end(mint)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        c = self.counters
+        lookups = c["hits"] + c["negative_hits"] + c["misses"] + c["coalesced"]
+        return {
+            **c,
+            "hit_rate": round((c["hits"] + c["negative_hits"]) / lookups, 3) if lookups else 0.0,
+            "cached": len(self._cache),
+            "inflight": len(self._inflight),
+            "added_latency": self.added_latency.snapshot(),
+        }
+
+    async def aclose(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        aclose = getattr(self.fetch, "aclose", None)
+        if aclose is not None:
+            await aclose()
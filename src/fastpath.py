@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+
+from telethon.tl import types
+
+# Updates that can carry a new message; passed to events.Raw(types=...).
+RAW_MESSAGE_TYPES = (
+    types.UpdateNewMessage,
+    types.UpdateNewChannelMessage,
+    types.UpdateShortMessage,
+    types.UpdateShortChatMessage,
+)
+RAW_EDIT_TYPES = (types.UpdateEditMessage, types.UpdateEditChannelMessage)
+
+_CHANNEL_OFFSET = 1_000_000_000_000
+
+
+@dataclass(slots=True)
+class RawMessage:
+    id: int
+    chat_id: int | None
+    sender_id: int | None
+    date: datetime | None
+    text: str
+    # Set for edits only
+    edit_date: datetime | None = None
+
+
+def marked_peer_id(peer: Any) -> int | None:
+    """Bot-API style ID for a Peer*, matching telethon.utils.get_peer_id."""
+    kind = type(peer)
+    if kind is types.PeerUser:
+        return int(peer.user_id)
+    if kind is types.PeerChannel:
+        return -(_CHANNEL_OFFSET + int(peer.channel_id))
+    if kind is types.PeerChat:
+        return -int(peer.chat_id)
+    return None
+
+
+class RawMessageFilter:
+    """Pull message fields straight off raw TL updates for a fixed set of senders.
+
+    Mirrors what `events.NewMessage(from_users=...)` accepts, without building
+    an Event, resolving entities or going through lazy properties. Sender IDs
+    are compared in their marked form (what `event.sender_id` returns). With
+    `edits=True`, edit updates are extracted too and carry `edit_date`.
+    """
+
+    def __init__(self, sender_ids: Iterable[int], *, edits: bool = False) -> None:
+        self.sender_ids = frozenset(sender_ids)
+        self.edits = edits
+
+    def extract(self, update: Any) -> RawMessage | None:
+        kind = type(update)
+        edit = kind is types.UpdateEditChannelMessage or kind is types.UpdateEditMessage
+        if kind is types.UpdateNewChannelMessage or kind is types.UpdateNewMessage or edit:
+            if edit and not self.edits:
+                return None
+            msg = update.message
+            if type(msg) is not types.Message or msg.out:
+                return None  # MessageService / MessageEmpty / our own sends
+            chat_id = marked_peer_id(msg.peer_id)
+            if msg.from_id is not None:
+                sender_id = marked_peer_id(msg.from_id)
+            elif msg.post or type(msg.peer_id) is types.PeerUser:
+                sender_id = chat_id
+            else:
+                sender_id = None
+            if sender_id not in self.sender_ids:
+                return None
+            return RawMessage(
+                msg.id,
+                chat_id,
+                sender_id,
+                msg.date,
+                msg.message or "",
+                (msg.edit_date or msg.date) if edit else None,
+            )
+        if kind is types.UpdateShortMessage:
+            if update.out or update.user_id not in self.sender_ids:
+                return None
+            uid = int(update.user_id)
+            return RawMessage(update.id, uid, uid, update.date, update.message or "")
+        if kind is types.UpdateShortChatMessage:
+            if update.out or update.from_id not in self.sender_ids:
+                return None
+            return RawMessage(
+                update.id,
+                -int(update.chat_id),
+                int(update.from_id),
+                update.date,
+                update.message or "",
+            )
+        return None
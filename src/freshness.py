@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from .config import STALE_ACTIONS
+
+
+class SkewTracker:
+    """Rolling estimate of (local clock - Telegram clock) in milliseconds.
+
+    Each message gives `local_receive - message.date`, i.e. skew plus delivery
+    delay. Delay is never negative, so the minimum over a recent window is the
+    best available skew estimate. Samples outside `sample_limit_ms` (backlog
+    replayed after a reconnect) are ignored so they cannot drag the estimate up.
+
+    A window made only of delayed backlog would still read as skew, so the
+    estimate is 0 until `min_samples` have been seen and is clamped to
+    +/-`max_skew_ms`: real delay beyond that is never subtracted away.
+    """
+
+    def __init__(
+        self,
+        window: int = 64,
+        sample_limit_ms: float = 10_000.0,
+        *,
+        max_skew_ms: float = 2_000.0,
+        min_samples: int = 3,
+    ) -> None:
+        self.sample_limit_ms = sample_limit_ms
+        self.max_skew_ms = max_skew_ms
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._skew_ms = 0.0
+
+    @property
+    def skew_ms(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return 0.0
+        return max(-self.max_skew_ms, min(self.max_skew_ms, self._skew_ms))
+
+    def observe(self, raw_lag_ms: float) -> None:
+        if abs(raw_lag_ms) > self.sample_limit_ms:
+            return
+        evicted = self._samples[0] if len(self._samples) == self._samples.maxlen else None
+        self._samples.append(raw_lag_ms)
+        if len(self._samples) == 1 or raw_lag_ms < self._skew_ms:
+            self._skew_ms = raw_lag_ms
+        elif evicted is not None and evicted <= self._skew_ms:
+            self._skew_ms = min(self._samples)
+
+
+@dataclass
+class Freshness:
+    message_ts: datetime | None
+    lag_ms: float | None
+    stale: bool
+
+
+class FreshnessGate:
+    """Measures per-message delivery lag and applies the configured max-age policy."""
+
+    def __init__(self, max_age_ms: int = 15_000, action: str = "tag") -> None:
+        self.tracker = SkewTracker()
+        self.max_age_ms = 0
+        self.action = "tag"
+        self.configure(max_age_ms, action)
+        self.counters: dict[str, int] = {
+            "fresh": 0,
+            "no_date": 0,
+            "stale_dropped": 0,
+            "stale_downgraded": 0,
+            "stale_tagged": 0,
+        }
+
+    def configure(self, max_age_ms: int, action: str) -> None:
+        if action not in STALE_ACTIONS:
+            raise ValueError(
+                f"stale action must be one of {', '.join(STALE_ACTIONS)}, got {action!r}"
+            )
+        self.max_age_ms = max_age_ms
+        self.action = action
+
+    def assess(self, message_date: datetime | None, received_at: float) -> Freshness:
+        """`received_at` is the local epoch time the update reached the handler."""
+        if message_date is None:
+            self.counters["no_date"] += 1
+            return Freshness(None, None, False)
+        sent_at = message_date.timestamp()
+        # Judge against earlier samples only, so a delayed message cannot
+        # become its own skew estimate.
+        fresh = self._judge(sent_at, received_at)
+        self.tracker.observe((received_at - sent_at) * 1000.0)
+        if not fresh.stale:
+            self.counters["fresh"] += 1
+        else:
+            key = {"drop": "stale_dropped", "downgrade": "stale_downgraded"}.get(
+                self.action, "stale_tagged"
+            )
+            self.counters[key] += 1
+        return fresh
+
+    def recheck(self, sent_at: float | None, now: float) -> Freshness:
+        """Judge an event again at `now` (spill replay) without feeding the skew estimate."""
+        if sent_at is None:
+            return Freshness(None, None, False)
+        return self._judge(sent_at, now)
+
+    def _judge(self, sent_at: float, received_at: float) -> Freshness:
+        lag_ms = max(0.0, (received_at - sent_at) * 1000.0 - self.tracker.skew_ms)
+        stale = 0 < self.max_age_ms < lag_ms
+        return Freshness(datetime.utcfromtimestamp(sent_at), round(lag_ms, 1), stale)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_age_ms": self.max_age_ms,
+            "action": self.action,
+            "skew_ms": round(self.tracker.skew_ms, 1),
+            **self.counters,
+        }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+import httpx
+from fastapi import Response
+
+from .status import StatusState
+from .telemetry import log_event
+
+# Consecutive failed deliveries before a critical sink counts as unhealthy, as
+# long as the latest failure is within this many probe intervals (a quiet
+# source may not deliver again for a long time to clear the count)
+SINK_FAILURES_UNHEALTHY = 3
+SINK_FAILURE_WINDOW_PROBES = 6
+
+
+class HealthMonitor:
+    """Liveness and readiness for the orchestrator, probed in the background.
+
+    `run` re-evaluates every dependency each `interval_sec` and renders the
+    `/readyz` body once; the endpoints only return that cached body, so
+    they cost nothing per request and never reach the executor themselves.
+    Readiness needs a connected Telegram client, registered handlers, every
+    critical sink in `sinks()` (SinkManager.stats) without a recent run of
+    failures and, if
+    configured, the executor's own health URL answering 2xx. The age of the
+    last source update is reported and only enforced when `max_update_age_sec`
+    is set (quiet sources are normal).
+    """
+
+    def __init__(
+        self,
+        status: StatusState,
+        *,
+        interval_sec: float = 5.0,
+        executor_url: str | None = None,
+        timeout_ms: int = 1000,
+        max_update_age_sec: float = 0.0,
+        sinks: Callable[[], dict[str, Any]] | None = None,
+    ) -> None:
+        self.status = status
+        self.interval = interval_sec
+        self.executor_url = executor_url
+        self.max_update_age = max_update_age_sec
+        self.sinks = sinks
+        self.connected: Callable[[], bool] = lambda: False
+        self.listening = False
+        self._client = httpx.AsyncClient(timeout=timeout_ms / 1000.0) if executor_url else None
+        self._executor: dict[str, Any] | None = None
+        self.ready = False
+        self.checked_at = 0.0
+        self._ready_body = b"{}"
+        self.publish()
+
+    def attach_client(self, client: Any) -> None:
+        self.connected = client.is_connected
+        self.publish()
+
+    def set_listening(self, listening: bool) -> None:
+        self.listening = listening
+        self.publish()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            if self._client is not None:
+                self._executor = await self._probe_executor()
+            self.publish()
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _probe_executor(self) -> dict[str, Any]:
+        assert self._client is not None and self.executor_url
+        t0 = time.perf_counter()
+        try:
+            response = await self._client.get(self.executor_url)
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}
+        return {
+            "ok": response.is_success,
+            "status_code": response.status_code,
+            "ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+
+    def _sink_checks(self, now: float) -> dict[str, dict[str, Any]]:
+        """One check per critical sink, named `sink:<name>`."""
+        if self.sinks is None:
+            return {}
+        window = SINK_FAILURE_WINDOW_PROBES * self.interval
+        checks: dict[str, dict[str, Any]] = {}
+        for name, stats in self.sinks().items():
+            if stats.get("priority") != "critical":
+                continue
+            failures = stats.get("consecutive_failures", 0)
+            failed_at = stats.get("last_failure_at")
+            recent = failed_at is not None and now - failed_at <= window
+            checks[f"sink:{name}"] = {
+                "ok": not recent or failures < SINK_FAILURES_UNHEALTHY,
+                "consecutive_failures": failures,
+                "last_success_at": stats.get("last_success_at"),
+                "last_failure_at": failed_at,
+                "last_error": stats.get("last_error"),
+            }
+        return checks
+
+    def publish(self) -> None:
+        """Recompute readiness from the latest probe results and cache the body."""
+        now = time.time()
+        checks: dict[str, dict[str, Any]] = {
+            "telegram": {"ok": bool(self.connected())},
+            "listening": {"ok": self.listening},
+        }
+        last = self.status.last_update_at
+        age = round(now - last, 1) if last is not None else None
+        checks["updates"] = {
+            "ok": not self.max_update_age or (age is not None and age <= self.max_update_age),
+            "last_update_age_sec": age,
+        }
+        checks.update(self._sink_checks(now))
+        if self._client is not None:
+            checks["executor"] = self._executor or {"ok": False, "error": "not probed yet"}
+
+        ready = all(check["ok"] for check in checks.values())
+        if ready != self.ready:
+            failing = [name for name, check in checks.items() if not check["ok"]]
+            log_event("readiness_changed", level="info" if ready else "warning", failing=failing)
+        self.ready = ready
+        self.checked_at = time.monotonic()
+        body = {
+            "ready": ready,
+            "checked_at": datetime.utcfromtimestamp(now).isoformat() + "Z",
+            "checks": checks,
+        }
+        self._ready_body = json.dumps(body, separators=(",", ":")).encode()
+
+    def healthz(self) -> Response:
+        """Liveness: the loop is still publishing probe results."""
+        stale = time.monotonic() - self.checked_at > 3 * self.interval
+        return Response(
+            b'{"status":"stale"}' if stale else b'{"status":"ok"}',
+            status_code=503 if stale else 200,
+            media_type="application/json",
+        )
+
+    def readyz(self) -> Response:
+        return Response(
+            self._ready_body,
+            status_code=200 if self.ready else 503,
+            media_type="application/json",
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from .telemetry import log_event
+
+# Layout under the journal directory, one segment per UTC day of writing:
+#   events-YYYYMMDD.jsonl        today's segment, plain JSON lines, appended
+#   events-YYYYMMDD.jsonl.zst    a closed day: independently compressed blocks
+#   events-YYYYMMDD.jsonl.gz       (gzip members when zstandard is not installed)
+#   events-YYYYMMDD.idx.json     sidecar for a closed day: block table plus
+#                                mint -> blocks and source (chat_id) -> blocks
+# Queries only read (and decompress) the blocks the index points at. Event
+# timestamps need not follow write order (late or replayed events), so blocks
+# and segments are pruned by the min/max event ts they hold, never by day name.
+PLAIN_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx.json"
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _gzip_codec() -> Codec:
+    return Codec("gzip", ".jsonl.gz", lambda b: gzip.compress(b, 6), gzip.decompress)
+
+
+def _zstd_codec() -> Codec | None:
+    try:
+        zstd = importlib.import_module("zstandard")
+    except ImportError:
+        return None
+    return Codec(
+        "zstd",
+        ".jsonl.zst",
+        zstd.ZstdCompressor(level=3).compress,
+        zstd.ZstdDecompressor().decompress,
+    )
+
+
+def default_codec() -> Codec:
+    return _zstd_codec() or _gzip_codec()
+
+
+def parse_ts(value: Any) -> float | None:
+    """Epoch seconds from a number or an ISO-8601 string (naive means UTC)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    dt = datetime.fromisoformat(text.removesuffix("Z"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _day(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%d")
+
+
+@dataclass(slots=True)
+class Block:
+    offset: int
+    length: int
+    min_ts: float
+    max_ts: float
+    count: int
+
+
+@dataclass
+class SegmentIndex:
+    blocks: list[Block] = field(default_factory=list)
+    mints: dict[str, list[int]] = field(default_factory=dict)
+    sources: dict[str, list[int]] = field(default_factory=dict)
+    min_ts: float | None = None
+    max_ts: float | None = None
+
+    def add(self, event: dict[str, Any], ts: float, offset: int, size: int, per_block: int) -> None:
+        blocks = self.blocks
+        if not blocks or blocks[-1].count >= per_block:
+            blocks.append(Block(offset, 0, ts, ts, 0))
+        block = blocks[-1]
+        block.length += size
+        block.min_ts = min(block.min_ts, ts)
+        block.max_ts = max(block.max_ts, ts)
+        block.count += 1
+        self.min_ts = ts if self.min_ts is None else min(self.min_ts, ts)
+        self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+        bid = len(blocks) - 1
+        for table, key in (
+            (self.mints, event.get("contract_address")),
+            (self.sources, event.get("chat_id")),
+        ):
+            if key is None:
+                continue
+            ids = table.setdefault(str(key), [])
+            if not ids or ids[-1] != bid:
+                ids.append(bid)
+
+    def overlaps(self, since: float | None, until: float | None) -> bool:
+        if self.min_ts is None or self.max_ts is None:
+            return False
+        return (since is None or self.max_ts >= since) and (until is None or self.min_ts <= until)
+
+    def candidates(
+        self, mint: str | None, source: str | None, since: float | None, until: float | None
+    ) -> list[int]:
+        ids: list[int] | None = None
+        if mint is not None:
+            ids = self.mints.get(mint, [])
+        if source is not None:
+            by_source = self.sources.get(source, [])
+            ids = by_source if ids is None else sorted(set(ids) & set(by_source))
+        if ids is None:
+            ids = list(range(len(self.blocks)))
+        return [
+            i
+            for i in ids
+            if (since is None or self.blocks[i].max_ts >= since)
+            and (until is None or self.blocks[i].min_ts <= until)
+        ]
+
+    def to_json(self, codec: str) -> dict[str, Any]:
+        return {
+            "codec": codec,
+            "blocks": [[b.offset, b.length, b.min_ts, b.max_ts, b.count] for b in self.blocks],
+            "mints": self.mints,
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> SegmentIndex:
+        blocks = [Block(*row) for row in data["blocks"]]
+        return cls(
+            blocks=blocks,
+            mints=data["mints"],
+            sources=data["sources"],
+            min_ts=min((b.min_ts for b in blocks), default=None),
+            max_ts=max((b.max_ts for b in blocks), default=None),
+        )
+
+
+class EventJournal:
+    """Append-only, day-rotated event journal with a per-segment block index.
+
+    `append` runs on the event loop and only enqueues; a writer thread
+    serialises, writes and indexes in batches, and compresses the previous
+    day's segment when the day rolls over. `query` is thread-safe and is meant
+    to be called from the status server's worker threads.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        block_events: int = 1024,
+        batch_max: int = 512,
+        flush_interval: float = 0.5,
+        retention_days: int = 0,
+        codec: Codec | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.block_events = block_events
+        self.batch_max = batch_max
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.codec = codec or default_codec()
+        self.clock = clock
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._day: str | None = None
+        self._file: Any = None
+        self._active = SegmentIndex()
+        self._closed: dict[str, SegmentIndex] = {}
+        self.counters: dict[str, int] = {"appended": 0, "written": 0, "batches": 0, "errors": 0}
+
+    # Event loop side
+    def append(self, payload: dict[str, Any]) -> None:
+        self.counters["appended"] += 1
+        self._queue.put(payload)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="event-journal", daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything appended so far is written and indexed."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # Writer thread
+    def _run(self) -> None:
+        try:
+            self._recover()
+        except Exception as exc:
+            self.counters["errors"] += 1
+            log_event("journal_recover_failed", level="error", error=str(exc))
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = [item for item in batch if isinstance(item, dict)]
+            try:
+                self._rotate_if_needed()
+                if events:
+                    self._write(events)
+            except Exception as exc:
+                self.counters["errors"] += 1
+                log_event("journal_write_failed", level="error", error=str(exc))
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    item.set()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _segment(self, day: str, suffix: str) -> Path:
+        return self.dir / f"events-{day}{suffix}"
+
+    def _recover(self) -> None:
+        """Index today's plain segment and compress any left over from earlier days."""
+        today = _day(self.clock())
+        for path in sorted(self.dir.glob(f"events-*{PLAIN_SUFFIX}")):
+            day = path.name[len("events-") : -len(PLAIN_SUFFIX)]
+            index = self._scan(path)
+            if day == today:
+                with self._lock:
+                    self._day, self._active = day, index
+                self._file = path.open("ab")
+            else:
+                self._compress(day, path, index)
+        for path in self.dir.glob(f"events-*{INDEX_SUFFIX}"):
+            day = path.name[len("events-") : -len(INDEX_SUFFIX)]
+            self._closed[day] = SegmentIndex.from_json(json.loads(path.read_text()))
+
+    def _scan(self, path: Path) -> SegmentIndex:
+        index = SegmentIndex()
+        offset = 0
+        with path.open("rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final write; the next append starts a fresh line
+                event = json.loads(line)
+                ts = parse_ts(event.get("ts")) or 0.0
+                index.add(event, ts, offset, len(line), self.block_events)
+                offset += len(line)
+        if offset != path.stat().st_size:
+            with path.open("r+b") as f:
+                f.truncate(offset)
+        return index
+
+    def _rotate_if_needed(self) -> None:
+        today = _day(self.clock())
+        if self._day == today:
+            return
+        previous, index = self._day, self._active
+        if self._file is not None:
+            self._file.close()
+        self._file = self._segment(today, PLAIN_SUFFIX).open("ab")
+        with self._lock:
+            self._day, self._active = today, SegmentIndex()
+        if previous is not None:
+            self._compress(previous, self._segment(previous, PLAIN_SUFFIX), index)
+        self._expire(today)
+
+    def _write(self, events: list[dict[str, Any]]) -> None:
+        lines = [json.dumps(e, separators=(",", ":")).encode() + b"\n" for e in events]
+        offset = self._file.tell()
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        with self._lock:
+            for event, line in zip(events, lines):
+                ts = parse_ts(event.get("ts")) or self.clock()
+                self._active.add(event, ts, offset, len(line), self.block_events)
+                offset += len(line)
+        self.counters["written"] += len(events)
+        self.counters["batches"] += 1
+
+    def _compress(self, day: str, plain: Path, index: SegmentIndex) -> None:
+        target = self._segment(day, self.codec.suffix)
+        packed = SegmentIndex(
+            mints=index.mints, sources=index.sources, min_ts=index.min_ts, max_ts=index.max_ts
+        )
+        offset = 0
+        with plain.open("rb") as src, target.open("wb") as dst:
+            for block in index.blocks:
+                src.seek(block.offset)
+                data = self.codec.compress(src.read(block.length))
+                dst.write(data)
+                packed.blocks.append(
+                    Block(offset, len(data), block.min_ts, block.max_ts, block.count)
+                )
+                offset += len(data)
+        sidecar = self._segment(day, INDEX_SUFFIX)
+        tmp = sidecar.with_suffix(".tmp")
+        tmp.write_text(json.dumps(packed.to_json(self.codec.name)))
+        tmp.replace(sidecar)
+        plain.unlink()
+        with self._lock:
+            self._closed[day] = packed
+        log_event("journal_segment_closed", day=day, blocks=len(packed.blocks), bytes=offset)
+
+    def _expire(self, today: str) -> None:
+        if self.retention_days <= 0:
+            return
+        cutoff = (
+            datetime.strptime(today, "%Y%m%d") - timedelta(days=self.retention_days)
+        ).strftime("%Y%m%d")
+        for day in [d for d in self._closed if d < cutoff]:
+            with self._lock:
+                del self._closed[day]
+            for path in self.dir.glob(f"events-{day}*"):
+                path.unlink()
+
+    # Queries (any thread)
+    def _read_block(self, day: str, block: Block, closed: bool) -> bytes:
+        if not closed:
+            with self._segment(day, PLAIN_SUFFIX).open("rb") as f:
+                f.seek(block.offset)
+                return f.read(block.length)
+        codec = self.codec
+        path = self._segment(day, codec.suffix)
+        if not path.exists():  # closed under the other codec
+            codec = _gzip_codec() if codec.name == "zstd" else (_zstd_codec() or codec)
+            path = self._segment(day, codec.suffix)
+        with path.open("rb") as f:
+            f.seek(block.offset)
+            return codec.decompress(f.read(block.length))
+
+    def query(
+        self,
+        *,
+        mint: str | None = None,
+        source: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """Events matching all given filters, oldest first, at most `limit`."""
+        with self._lock:
+            segments: list[tuple[str, SegmentIndex, bool]] = [
+                (day, idx, True) for day, idx in sorted(self._closed.items())
+            ]
+            if self._day is not None:
+                # Copy what this query needs so concurrent appends cannot move it.
+                live = self._active
+                active = SegmentIndex(
+                    blocks=[
+                        Block(b.offset, b.length, b.min_ts, b.max_ts, b.count) for b in live.blocks
+                    ],
+                    min_ts=live.min_ts,
+                    max_ts=live.max_ts,
+                    mints={mint: list(live.mints.get(mint, ()))} if mint is not None else {},
+                    sources=(
+                        {source: list(live.sources.get(source, ()))} if source is not None else {}
+                    ),
+                )
+                segments.append((self._day, active, False))
+        # Lines are compact JSON written by _write, so a byte search rules out
+        # most lines of a candidate block before anything is decoded.
+        needle: bytes | None = None
+        if mint is not None:
+            needle = b'"contract_address":' + json.dumps(mint).encode()
+        elif source is not None:
+            needle = b'"chat_id":' + source.encode()
+        events: list[dict[str, Any]] = []
+        scanned = 0
+        for day, index, closed in segments:
+            if not index.overlaps(since, until):
+                continue
+            for bid in index.candidates(mint, source, since, until):
+                scanned += 1
+                block = index.blocks[bid]
+                check_ts = (since is not None and block.min_ts < since) or (
+                    until is not None and block.max_ts > until
+                )
+                for line in self._read_block(day, block, closed).splitlines():
+                    if needle is not None and needle not in line:
+                        continue
+                    event = json.loads(line)
+                    if mint is not None and event.get("contract_address") != mint:
+                        continue
+                    if source is not None and str(event.get("chat_id")) != source:
+                        continue
+                    if check_ts:
+                        ts = parse_ts(event.get("ts"))
+                        if ts is not None and (
+                            (since is not None and ts < since) or (until is not None and ts > until)
+                        ):
+                            continue
+                    events.append(event)
+                    if len(events) >= limit:
+                        return {"events": events, "blocks_scanned": scanned, "truncated": True}
+        return {"events": events, "blocks_scanned": scanned, "truncated": False}
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            active_blocks = len(self._active.blocks)
+            closed = len(self._closed)
+        return {
+            **self.counters,
+            "pending": self._queue.qsize(),
+            "codec": self.codec.name,
+            "segment": self._day,
+            "active_blocks": active_blocks,
+            "closed_segments": closed,
+        }
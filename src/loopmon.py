@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from types import FrameType
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response
+
+from .metrics import LatencyWindow
+from .telemetry import log_event
+
+PROFILE_FORMATS = ("text", "pstats", "collapsed")
+MAX_PROFILE_SECONDS = 60.0
+
+
+def _collapse(frame: FrameType | None, limit: int = 64) -> str:
+    """Outermost-first `file:function:line` frames joined by ';' (flamegraph input)."""
+    parts = [
+        f"{fs.filename.rsplit('/', 1)[-1]}:{fs.name}:{fs.lineno}"
+        for fs in traceback.extract_stack(frame, limit=limit)
+    ]
+    return ";".join(parts)
+
+
+class LoopMonitor:
+    """Cheap always-on event loop health metrics plus on-demand profiling.
+
+    A `call_later` heartbeat records how late it fires (loop lag). A watchdog
+    thread notices when the heartbeat stops for longer than `stall_ms` and
+    grabs the loop thread's stack while it is still blocked, so each stall is
+    reported with the code that caused it. Unlike asyncio debug mode this
+    adds no per-callback overhead. `clock` times lag and stalls (tests pass a
+    fake one); the heartbeat itself is always scheduled on the loop's clock.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval_ms: int = 100,
+        stall_ms: int = 100,
+        keep_stalls: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval_ms / 1000.0
+        self.stall = stall_ms / 1000.0
+        self.lag = LatencyWindow()
+        self.max_lag_ns = 0
+        self.stalls = 0
+        self.recent_stalls: deque[dict[str, Any]] = deque(maxlen=keep_stalls)
+        self.clock = clock
+        # Heartbeat time the current stall started at; None while the loop is responsive
+        self.stalled_since: float | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._expected = 0.0
+        self._beat = 0.0
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+        self._profiling = threading.Lock()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = self.clock()
+        self._schedule()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(1.0)
+            self._watchdog = None
+
+    # Loop side: one timer callback per interval
+    def _schedule(self) -> None:
+        assert self._loop is not None
+        self._expected = self.clock() + self.interval
+        self._handle = self._loop.call_later(self.interval, self._tick)
+
+    def _tick(self) -> None:
+        now = self.clock()
+        lag_ns = max(0, int((now - self._expected) * 1e9))
+        self.lag.record(lag_ns)
+        self.max_lag_ns = max(self.max_lag_ns, lag_ns)
+        self._beat = now
+        self._schedule()
+
+    # Watchdog thread
+    def _watch(self) -> None:
+        poll = min(self.interval, self.stall) / 2
+        stack = ""
+        while not self._stop.wait(poll):
+            beat = self._beat
+            since = self.stalled_since
+            silent = self.clock() - beat - self.interval
+            if since is None and silent > self.stall:
+                frame = sys._current_frames().get(self._loop_thread or 0)
+                stack = _collapse(frame)
+                self.stalled_since = beat
+            elif since is not None and beat != since:
+                self._record_stall(beat - since - self.interval, stack)
+                self.stalled_since = None
+
+    def _record_stall(self, seconds: float, stack: str) -> None:
+        self.stalls += 1
+        top = stack.rsplit(";", 1)[-1]
+        self.recent_stalls.appendleft(
+            {"at": time.time(), "ms": round(seconds * 1000, 1), "top": top, "stack": stack}
+        )
+        log_event("loop_stall", level="warning", ms=round(seconds * 1000, 1), top=top)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "lag": self.lag.snapshot(),
+            "max_lag_ms": round(self.max_lag_ns / 1e6, 3),
+            "stalls": self.stalls,
+            "recent_stalls": [
+                {k: v for k, v in s.items() if k != "stack"} for s in self.recent_stalls
+            ],
+        }
+
+    # Profiling (called from status server worker threads, never the loop)
+    def _call_in_loop(self, fn: Callable[[], Any]) -> None:
+        assert self._loop is not None
+        done = threading.Event()
+
+        def run() -> None:
+            try:
+                fn()
+            finally:
+                done.set()
+
+        self._loop.call_soon_threadsafe(run)
+        if not done.wait(5.0):
+            raise RuntimeError("event loop did not respond within 5s")
+
+    def profile(self, seconds: float) -> pstats.Stats:
+        """cProfile the loop thread for `seconds`."""
+        profiler = cProfile.Profile()
+        self._call_in_loop(profiler.enable)
+        try:
+            time.sleep(seconds)
+        finally:
+            self._call_in_loop(profiler.disable)
+        return pstats.Stats(profiler)
+
+    def sample(self, seconds: float, every: float = 0.005) -> Counter[str]:
+        """Sample the loop thread's stack; returns collapsed stack -> sample count.
+
+        Samples are taken when the sampler gets the GIL, which biases them
+        towards points where the loop releases it (select, I/O); code that
+        blocks the loop for milliseconds at a time still shows up reliably.
+        """
+        counts: Counter[str] = Counter()
+        deadline = time.monotonic() + seconds
+        tid = self._loop_thread or 0
+        while time.monotonic() < deadline:
+            counts[_collapse(sys._current_frames().get(tid))] += 1
+            time.sleep(every)
+        return counts
+
+
+def profile_endpoint(monitor: LoopMonitor) -> Callable[..., Response]:
+    """GET /debug/profile?seconds=N&format=text|pstats|collapsed for the status server.
+
+    `text` and `pstats` run cProfile on the loop thread (`pstats` returns the
+    marshalled stats for `pstats.Stats`/snakeviz); `collapsed` samples stacks
+    instead, which costs the loop nothing, in flamegraph.pl input format.
+    """
+
+    def debug_profile(seconds: float = 5.0, format: str = "text") -> Response:
+        if format not in PROFILE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {PROFILE_FORMATS}")
+        seconds = max(0.1, min(seconds, MAX_PROFILE_SECONDS))
+        if not monitor._profiling.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="a profile is already running")
+        try:
+            if format == "collapsed":
+                counts = monitor.sample(seconds)
+                body = "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+                return Response(body, media_type="text/plain")
+            stats = monitor.profile(seconds)
+            if format == "pstats":
+                return Response(
+                    marshal.dumps(stats.stats),  # type: ignore[attr-defined]
+                    media_type="application/octet-stream",
+                    headers={"content-disposition": "attachment; filename=relay.pstats"},
+                )
+            out = io.StringIO()
+            stats.stream = out  # type: ignore[attr-defined]
+            stats.sort_stats("cumulative").print_stats(60)
+            return Response(out.getvalue(), media_type="text/plain")
+        finally:
+            monitor._profiling.release()
+
+    return debug_profile
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+
+class LatencyWindow:
+    """Keeps the most recent latency samples (ns) for cheap percentile snapshots.
+
+    Recording is an append; sorting happens only when a snapshot is requested,
+    which is the status endpoint's problem rather than the hot path's.
+    """
+
+    def __init__(self, maxlen: int = 1024) -> None:
+        self._samples: deque[int] = deque(maxlen=maxlen)
+        self.count = 0
+
+    def record(self, ns: int) -> None:
+        self._samples.append(ns)
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"count": self.count}
+        n = len(ordered)
+
+        def pct(q: float) -> float:
+            return round(ordered[min(n - 1, int(q * n))] / 1e6, 3)
+
+        return {
+            "count": self.count,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] / 1e6, 3),
+        }
@@ -12,10 +12,21 @@ class ParsedSignal(BaseModel):
     message_id: Optional[int] = None
     chat_id: Optional[int] = None
     sender_id: Optional[int] = None
+    # Telegram-side send time and measured delivery lag (see freshness.FreshnessGate)
+    message_ts: Optional[datetime] = None
+    lag_ms: Optional[float] = None
+    stale: bool = False
+    # Delivered through a message edit rather than a new message
+    edited: bool = False
 
     # Parsed fields
     contract_address: Optional[str] = None
     raw_text: str = ""
+    # Rules engine outcome: the include rule that let it through and detected side
+    rule: Optional[str] = None
+    side: Optional[str] = None
+    # Executor-facing metadata for the mint, when the enrichment stage is enabled
+    mint_meta: Optional[dict[str, Any]] = None
 
     def to_event(self) -> dict[str, Any]:
         return {
@@ -25,4 +36,11 @@ class ParsedSignal(BaseModel):
             "chat_id": self.chat_id,
             "sender_id": self.sender_id,
             "contract_address": self.contract_address,
+            "side": self.side,
+            "rule": self.rule,
+            "message_ts": self.message_ts.isoformat() + "Z" if self.message_ts else None,
+            "lag_ms": self.lag_ms,
+            "stale": self.stale,
+            "edited": self.edited,
+            "mint_meta": self.mint_meta,
         }
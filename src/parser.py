@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Optional
+from typing import List, Optional
 
 from .models import ParsedSignal
 
@@ -19,3 +19,9 @@ def parse_signal(text: str) -> ParsedSignal:
     contract_address: Optional[str] = match.group(1) if match else None
 
     return ParsedSignal(contract_address=contract_address, raw_text=text)
+
+
+def parse_mints(text: str) -> List[str]:
+    """All distinct contract addresses in the message, in order of appearance."""
+
+    return list(dict.fromkeys(MINT_RE.findall(text)))
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, Protocol
+
+from .config import Config
+from .edits import EditTracker
+from .enrich import MintEnricher
+from .fastpath import RawMessageFilter
+from .freshness import Freshness, FreshnessGate
+from .journal import EventJournal, parse_ts
+from .models import ParsedSignal
+from .parser import parse_signal
+from .rules import RuleError, RulesEngine, load_rules
+from .state import StateManager
+from .status import StatusState
+from .telemetry import log_event
+
+# Called with (stage name, duration in nanoseconds) after each handler stage.
+StageObserver = Callable[[str, int], None]
+
+
+class SupportsEmit(Protocol):
+    async def emit(self, payload: dict[str, Any], *, critical: bool = True) -> None: ...
+
+
+class RelayPipeline:
+    """Per-message handler logic, independent of the Telegram client.
+
+    `run()` registers `handle`/`handle_edit` (NewMessage / MessageEdited
+    events) or `handle_raw` (raw TL updates) with Telethon; all feed `process`.
+    Benchmarks and tests drive `handle` with fake events exposing `message.id`,
+    `chat_id`, `sender_id` and `raw_text`.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        state: StateManager,
+        sinks: SupportsEmit,
+        status: StatusState,
+        *,
+        observe: StageObserver | None = None,
+        enricher: MintEnricher | None = None,
+        journal: EventJournal | None = None,
+    ) -> None:
+        self.cfg = cfg
+        self.state = state
+        self.sinks = sinks
+        self.status = status
+        self.observe = observe
+        self.enricher = enricher
+        self.journal = journal
+        self.freshness = FreshnessGate(cfg.signal_max_age_ms, cfg.signal_stale_action)
+        self.edits = EditTracker(cfg.signal_edit_cache_size) if cfg.signal_handle_edits else None
+        self.rules = RulesEngine(cfg.rules_file) if cfg.rules_file else None
+        self.raw_filter = RawMessageFilter([cfg.signal_source_id], edits=self.edits is not None)
+        # Shutdown: once intake is closed new messages are ignored (and left
+        # unmarked); handlers already running are tracked so they can drain.
+        self.accepting = True
+        self._inflight: set[asyncio.Task[Any]] = set()
+        # Cleared while spilled events are replayed: handlers wait before emitting.
+        self._emits_open = asyncio.Event()
+        self._emits_open.set()
+        # (payload, critical) of claimed messages cancelled before reaching the sinks
+        self._unsent: list[tuple[dict[str, Any], bool]] = []
+
+    def check_reload(self, cfg: Config) -> None:
+        """Raise RuleError if `cfg`'s rule file would not load; nothing is applied."""
+        if cfg.rules_file:
+            load_rules(cfg.rules_file)
+
+    def reload(self, cfg: Config) -> None:
+        self.cfg = cfg
+        self.reload_rules()
+        self.freshness.configure(cfg.signal_max_age_ms, cfg.signal_stale_action)
+        if self.enricher is not None:
+            self.enricher.budget = cfg.enrich_budget_ms / 1000.0
+
+    def reload_rules(self) -> None:
+        """Pick up RULES_FILE changes: a new path, removal, or edited contents."""
+        path = self.cfg.rules_file
+        if not path:
+            self.rules = None
+        elif self.rules is None or str(self.rules.path) != path:
+            try:
+                self.rules = RulesEngine(path)
+            except RuleError as exc:
+                log_event("rules_reload_failed", level="error", path=path, error=str(exc))
+        else:
+            self.rules.reload()
+
+    def close_intake(self) -> None:
+        self.accepting = False
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to `timeout` for running handlers; False if some are still going."""
+        if self._inflight:
+            await asyncio.wait(set(self._inflight), timeout=max(0.0, timeout))
+        return not self._inflight
+
+    def hold_emits(self) -> None:
+        """Queue new events behind a spill replay until `release_emits`."""
+        self._emits_open.clear()
+
+    def release_emits(self) -> None:
+        self._emits_open.set()
+
+    def take_unsent(self) -> list[tuple[dict[str, Any], bool]]:
+        """(payload, critical) for messages marked processed whose handler was
+        cancelled before handing them to the sinks; spill them so they are not lost."""
+        unsent, self._unsent = self._unsent, []
+        return unsent
+
+    async def cancel_inflight(self) -> None:
+        tasks = list(self._inflight)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def screen_replay(
+        self, entries: list[tuple[str, dict[str, Any]]]
+    ) -> tuple[list[tuple[str, dict[str, Any]]], list[tuple[str, dict[str, Any]]]]:
+        """Apply the freshness policy to spilled events before they are replayed.
+
+        Lag is re-measured from each event's `message_ts` to now. Returns
+        (entries to replay, stale entries to replay to best-effort sinks only);
+        stale entries under the drop action are left out.
+        """
+        now = time.time()
+        action = self.freshness.action
+        keep: list[tuple[str, dict[str, Any]]] = []
+        downgraded: list[tuple[str, dict[str, Any]]] = []
+        for name, payload in entries:
+            try:
+                sent_at = parse_ts(payload.get("message_ts"))
+            except ValueError:
+                sent_at = None
+            fresh = self.freshness.recheck(sent_at, now)
+            if fresh.lag_ms is not None:
+                payload = {**payload, "lag_ms": fresh.lag_ms, "stale": fresh.stale}
+            if fresh.stale and action == "drop":
+                log_event(
+                    "stale_dropped",
+                    message_id=payload.get("message_id"),
+                    lag_ms=fresh.lag_ms,
+                    replayed=True,
+                )
+                continue
+            (downgraded if fresh.stale and action == "downgrade" else keep).append((name, payload))
+        return keep, downgraded
+
+    async def handle(self, event: Any) -> None:  # Telethon type is dynamic
+        received_at = time.time()
+        t0 = time.perf_counter_ns()
+        try:
+            msg_id, chat_id, sender_id, text = self._fields(event)
+            date = getattr(event.message, "date", None)
+        except Exception as exc:
+            log_event("handler_error", level="error", error=str(exc))
+            return
+        await self.process(msg_id, chat_id, sender_id, date, text, received_at, t0)
+
+    async def handle_edit(self, event: Any) -> None:
+        """MessageEdited handler; the edit time stands in for the send time."""
+        received_at = time.time()
+        t0 = time.perf_counter_ns()
+        try:
+            msg_id, chat_id, sender_id, text = self._fields(event)
+            msg = event.message
+            date = getattr(msg, "edit_date", None) or getattr(msg, "date", None)
+        except Exception as exc:
+            log_event("handler_error", level="error", error=str(exc))
+            return
+        await self.process(msg_id, chat_id, sender_id, date, text, received_at, t0, edited=True)
+
+    @staticmethod
+    def _fields(event: Any) -> tuple[int, int | None, int | None, str]:
+        msg_id = int(event.message.id)
+        chat_id = int(event.chat_id) if getattr(event, "chat_id", None) else None
+        sender_id = int(event.sender_id) if getattr(event, "sender_id", None) else None
+        return msg_id, chat_id, sender_id, event.raw_text or ""
+
+    async def handle_raw(self, update: Any) -> None:
+        """Opt-in `events.Raw` handler: filters and extracts from the TL update directly."""
+        received_at = time.time()
+        t0 = time.perf_counter_ns()
+        raw = self.raw_filter.extract(update)
+        if raw is None:
+            return
+        edited = raw.edit_date is not None
+        date = raw.edit_date if edited else raw.date
+        await self.process(
+            raw.id, raw.chat_id, raw.sender_id, date, raw.text, received_at, t0, edited=edited
+        )
+
+    async def process(
+        self,
+        msg_id: int,
+        chat_id: int | None,
+        sender_id: int | None,
+        date: datetime | None,
+        text: str,
+        received_at: float,
+        t0: int,
+        *,
+        edited: bool = False,
+    ) -> None:
+        if not self.accepting:
+            return
+        self.status.last_update_at = received_at
+        task = asyncio.current_task()
+        if task is not None:
+            self._inflight.add(task)
+        clock = time.perf_counter_ns
+        source = self.cfg.signal_source_id
+        try:
+            if edited and self.edits is not None and self.edits.tracks(source, msg_id):
+                await self._process_edit(msg_id, chat_id, sender_id, date, text, received_at)
+                return
+            if not self.state.should_process(source, msg_id):
+                if edited and self.edits is not None:
+                    # Processed before we started tracking it (restart or eviction):
+                    # we cannot tell which mints went out, so emit nothing.
+                    self.edits.counters["untracked"] += 1
+                return
+
+            fresh = self.freshness.assess(date, received_at)
+            if fresh.stale and self.freshness.action == "drop":
+                self.state.mark_processed(source, msg_id)
+                log_event("stale_dropped", message_id=msg_id, lag_ms=fresh.lag_ms)
+                return
+
+            text = text.strip()
+            t1 = clock()
+            parsed: ParsedSignal = parse_signal(text)
+            parsed.message_id = msg_id
+            parsed.chat_id = chat_id
+            parsed.sender_id = sender_id
+            parsed.edited = edited
+            if self.rules is not None:
+                verdict = self.rules.evaluate(source, sender_id, text)
+                if not verdict.allowed:
+                    self.state.mark_processed(source, msg_id)
+                    if self.edits is not None:
+                        self.edits.remember(source, msg_id, text)
+                    return
+                parsed.rule = verdict.rule
+                parsed.side = verdict.side
+            t2 = clock()
+            # Claim the message before awaiting delivery: a duplicate or an edit
+            # arriving mid-emit must see it as handled, with only the emitted mint known.
+            self.state.mark_processed(source, msg_id)
+            if self.edits is not None:
+                ca = parsed.contract_address
+                self.edits.remember(source, msg_id, text, [ca] if ca else [])
+            payload, t3 = await self._emit(parsed, fresh)
+            t4 = clock()
+            self._record(payload)
+            if self.observe is not None:
+                t5 = clock()
+                self.observe("extract", t1 - t0)
+                self.observe("parse", t2 - t1)
+                self.observe("enrich", t3 - t2)
+                self.observe("emit", t4 - t3)
+                self.observe("record", t5 - t4)
+                self.observe("total", t5 - t0)
+        except Exception as exc:
+            log_event("handler_error", level="error", error=str(exc))
+        finally:
+            if task is not None:
+                self._inflight.discard(task)
+
+    async def _process_edit(
+        self,
+        msg_id: int,
+        chat_id: int | None,
+        sender_id: int | None,
+        date: datetime | None,
+        text: str,
+        received_at: float,
+    ) -> None:
+        assert self.edits is not None
+        text = text.strip()
+        mints = self.edits.new_mints(self.cfg.signal_source_id, msg_id, text)
+        if not mints:
+            return
+        fresh = self.freshness.assess(date, received_at)
+        if fresh.stale and self.freshness.action == "drop":
+            log_event("stale_dropped", message_id=msg_id, lag_ms=fresh.lag_ms, edited=True)
+            return
+        rule: str | None = None
+        side: str | None = None
+        if self.rules is not None:
+            verdict = self.rules.evaluate(self.cfg.signal_source_id, sender_id, text)
+            if not verdict.allowed:
+                return
+            rule, side = verdict.rule, verdict.side
+        for mint in mints:
+            parsed = ParsedSignal(
+                contract_address=mint,
+                raw_text=text,
+                message_id=msg_id,
+                chat_id=chat_id,
+                sender_id=sender_id,
+                edited=True,
+                rule=rule,
+                side=side,
+            )
+            payload, _ = await self._emit(parsed, fresh)
+            self._record(payload)
+
+    def _record(self, payload: dict[str, Any]) -> None:
+        self.status.record(payload)
+        if self.journal is not None:
+            self.journal.append(payload)
+
+    async def _emit(self, parsed: ParsedSignal, fresh: Freshness) -> tuple[dict[str, Any], int]:
+        """Stamp freshness, enrich and deliver; returns the payload and the pre-emit clock."""
+        parsed.message_ts = fresh.message_ts
+        parsed.lag_ms = fresh.lag_ms
+        parsed.stale = fresh.stale
+        # Downgraded events still reach the log sinks but never the executor.
+        critical = not (fresh.stale and self.freshness.action == "downgrade")
+        try:
+            if self.enricher is not None and parsed.contract_address:
+                parsed.mint_meta = await self.enricher.enrich(parsed.contract_address)
+            if not self._emits_open.is_set():
+                await self._emits_open.wait()
+        except asyncio.CancelledError:
+            # Already claimed, so nothing would deliver it again
+            self._unsent.append((parsed.to_event(), critical))
+            raise
+        payload = parsed.to_event()
+        t_emit = time.perf_counter_ns()
+        await self.sinks.emit(payload, critical=critical)
+        return payload, t_emit
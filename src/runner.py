@@ -2,68 +2,90 @@ from __future__ import annotations
 
 import asyncio
 import signal
-from typing import Any, Dict, List
 import contextlib
 from pathlib import Path
 
+from dotenv import load_dotenv
 from telethon import TelegramClient, events, __version__ as telethon_version
 from telethon.errors.rpcerrorlist import UpdateAppToLoginError
 
 from .config import Config
-from .models import ParsedSignal
-from .parser import parse_signal
-from .sinks.stdout import StdoutSink
-from .sinks.webhook import WebhookSink
+from .enrich import HttpMintFetcher, MintEnricher
+from .fastpath import RAW_EDIT_TYPES, RAW_MESSAGE_TYPES
+from .health import HealthMonitor
+from .journal import EventJournal
+from .loopmon import LoopMonitor, profile_endpoint
+from .pipeline import RelayPipeline
+from .shutdown import PhaseTimer, Spill
+from .sinks.manager import SinkManager
 from .state import StateManager
-from .status import StatusState, serve_status
-from .telemetry import log_event
+from .status import StatusState, events_endpoint, serve_status
+from .telemetry import log_event, telemetry
 from .tg_identity import resolve_identity
+from .watch import FileWatcher
 
 
-class SinkManager:
-    def __init__(self, cfg: Config) -> None:
-        self.cfg = cfg
-        self.stdout = StdoutSink() if cfg.event_sink_stdout else None
-        self.webhook = (
-            WebhookSink(
-                cfg.event_webhook_url,
-                secret=cfg.event_webhook_secret,
-                timeout_ms=cfg.event_webhook_timeout_ms,
-                max_retries=cfg.event_webhook_max_retries,
-            )
-            if cfg.event_webhook_url
-            else None
-        )
-
-    def reload(self, cfg: Config) -> None:
-        self.cfg = cfg
-        self.stdout = StdoutSink() if cfg.event_sink_stdout else None
-        # recreate webhook sink if URL changed
-        if cfg.event_webhook_url:
-            self.webhook = WebhookSink(
-                cfg.event_webhook_url,
-                secret=cfg.event_webhook_secret,
-                timeout_ms=cfg.event_webhook_timeout_ms,
-                max_retries=cfg.event_webhook_max_retries,
-            )
-        else:
-            self.webhook = None
-
-    async def emit(self, payload: Dict[str, Any]) -> None:
-        tasks: List[asyncio.Task[None]] = []
-        if self.stdout:
-            tasks.append(asyncio.create_task(self.stdout.emit(payload)))
-        if self.webhook:
-            tasks.append(asyncio.create_task(self.webhook.emit(payload)))
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+def _configure_logging(cfg: Config) -> None:
+    telemetry.configure(
+        level=cfg.log_level,
+        rate_per_sec=cfg.log_rate_per_sec,
+        burst=cfg.log_burst,
+        sample_rate=cfg.log_sample_rate,
+        sampled_events=cfg.log_sampled_events,
+    )
 
 
 async def run() -> None:
     cfg = Config.from_env()
+    _configure_logging(cfg)
     state = StateManager(cfg.state_dir, cfg.state_last_seen_file)
     sinks = SinkManager(cfg)
     status_state = StatusState()
+    enricher = (
+        MintEnricher(
+            HttpMintFetcher(cfg.enrich_url, timeout_ms=cfg.enrich_timeout_ms),
+            ttl_sec=cfg.enrich_ttl_sec,
+            negative_ttl_sec=cfg.enrich_negative_ttl_sec,
+            max_entries=cfg.enrich_cache_size,
+            budget_ms=cfg.enrich_budget_ms,
+        )
+        if cfg.enrich_url
+        else None
+    )
+    journal = (
+        EventJournal(Path(cfg.state_dir) / "journal", retention_days=cfg.journal_retention_days)
+        if cfg.journal_enabled
+        else None
+    )
+    pipeline = RelayPipeline(cfg, state, sinks, status_state, enricher=enricher, journal=journal)
+    if journal is not None:
+        journal.start()
+        status_state.add_section("journal", journal.stats)
+        status_state.add_route("/events", events_endpoint(journal))
+    status_state.add_section("freshness", pipeline.freshness.stats)
+    if pipeline.edits is not None:
+        status_state.add_section("edits", pipeline.edits.stats)
+    if enricher is not None:
+        status_state.add_section("enrichment", enricher.stats)
+    status_state.add_section("sinks", sinks.stats)
+    loop_monitor = LoopMonitor(interval_ms=cfg.loop_monitor_interval_ms, stall_ms=cfg.loop_stall_ms)
+    loop_monitor.start()
+    status_state.add_section("loop", loop_monitor.stats)
+    status_state.add_section("telemetry", telemetry.stats)
+    if cfg.debug_profile_enabled:
+        status_state.add_route("/debug/profile", profile_endpoint(loop_monitor))
+    status_state.add_section(
+        "rules", lambda: pipeline.rules.stats() if pipeline.rules is not None else {}
+    )
+    health = HealthMonitor(
+        status_state,
+        interval_sec=cfg.health_probe_interval_ms / 1000.0,
+        executor_url=cfg.executor_healthz_url,
+        max_update_age_sec=cfg.ready_max_update_age_sec,
+        sinks=sinks.stats,
+    )
+    status_state.add_route("/healthz", health.healthz)
+    status_state.add_route("/readyz", health.readyz)
 
     stop_event = asyncio.Event()
 
@@ -75,10 +97,29 @@ async def run() -> None:
         log_event("signal", signal="SIGINT")
         stop_event.set()
 
+    def _reload(trigger: str) -> None:
+        try:
+            # Vet the rule file with the rest, so a bad one rejects the whole
+            # reload instead of failing after the sinks were swapped.
+            cfg.hot_reload(check=pipeline.check_reload)
+        except ValueError as exc:
+            log_event("reload_rejected", level="error", trigger=trigger, error=str(exc))
+            return
+        _configure_logging(cfg)
+        pipeline.reload(cfg)
+        changed = sinks.reload(cfg)
+        log_event("reloaded_config", trigger=trigger, sinks_rebuilt=changed)
+
     def _sighup(*_: int) -> None:
-        cfg.hot_reload()
-        sinks.reload(cfg)
-        log_event("reloaded_config")
+        _reload("SIGHUP")
+
+    def _config_file_changed(path: Path) -> None:
+        if cfg.rules_file and path == Path(cfg.rules_file):
+            pipeline.reload_rules()
+            return
+        # Values removed from the file stay in os.environ until restart.
+        load_dotenv(path, override=True)
+        _reload(f"watch:{path}")
 
     loop = asyncio.get_running_loop()
     for s in (signal.SIGTERM, signal.SIGINT):
@@ -98,6 +139,17 @@ async def run() -> None:
         lang_code=identity.lang_code,
         system_lang_code=identity.system_lang_code,
     )
+
+    # Status server and health probes come up before login, so /readyz can
+    # report a relay stuck in client.start().
+    status_task: asyncio.Task[None] | None = None
+    if cfg.status_http_enabled:
+        status_task = asyncio.create_task(
+            serve_status(cfg.status_http_host, cfg.status_http_port, status_state)
+        )
+    health.attach_client(client)
+    health_task = asyncio.create_task(health.run(stop_event))
+
     log_event(
         "tg_identity",
         device_model=identity.device_model,
@@ -158,15 +210,24 @@ async def run() -> None:
             ),
             error=str(e),
         )
+        stop_event.set()
+        for task in (status_task, health_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+        await health.aclose()
         return
     log_event("client_started", session=cfg.session_name)
+    sinks.attach_client(client)
 
-    # Status server
-    status_task: asyncio.Task[None] | None = None
-    if cfg.status_http_enabled:
-        status_task = asyncio.create_task(
-            serve_status(cfg.status_http_host, cfg.status_http_port, status_state)
-        )
+    # Events the previous run could not deliver go out before new ones. Handlers
+    # are registered first (Telethon drops updates nobody listens for) and their
+    # emits wait until the replay is done.
+    spill = Spill(cfg.state_dir)
+    spilled = spill.load()
+    if spilled:
+        pipeline.hold_emits()
 
     # Periodic state flush
     async def _periodic_flush() -> None:
@@ -174,47 +235,104 @@ async def run() -> None:
             while not stop_event.is_set():
                 await asyncio.sleep(5)
                 state.flush()
+                telemetry.flush_suppressed()
         except asyncio.CancelledError:
             return
 
     flush_task = asyncio.create_task(_periodic_flush())
 
-    @client.on(events.NewMessage(from_users=cfg.signal_source_id))  # type: ignore[misc]
-    async def handler(event: Any) -> None:  # Telethon type is dynamic
-        try:
-            msg_id = int(event.message.id)
-            chat_id = int(event.chat_id) if getattr(event, "chat_id", None) else None
-            sender_id = int(event.sender_id) if getattr(event, "sender_id", None) else None
-
-            if not state.should_process(cfg.signal_source_id, msg_id):
-                return
+    watch_task: asyncio.Task[None] | None = None
+    watched = [Path(p) for p in (cfg.config_watch_file, cfg.rules_file) if p]
+    if watched:
+        watcher = FileWatcher(
+            watched,
+            _config_file_changed,
+            interval=cfg.config_watch_interval_ms / 1000.0,
+        )
+        watch_task = asyncio.create_task(watcher.run(stop_event))
 
-            text = (event.raw_text or "").strip()
-            parsed: ParsedSignal = parse_signal(text)
-            parsed.message_id = msg_id
-            parsed.chat_id = chat_id
-            parsed.sender_id = sender_id
+    if cfg.tg_raw_fastpath:
+        raw_types = RAW_MESSAGE_TYPES + (RAW_EDIT_TYPES if cfg.signal_handle_edits else ())
+        client.add_event_handler(pipeline.handle_raw, events.Raw(types=list(raw_types)))
+    else:
+        client.add_event_handler(
+            pipeline.handle, events.NewMessage(from_users=cfg.signal_source_id)
+        )
+        if cfg.signal_handle_edits:
+            client.add_event_handler(
+                pipeline.handle_edit, events.MessageEdited(from_users=cfg.signal_source_id)
+            )
 
-            payload = parsed.to_event()
-            await sinks.emit(payload)
-            status_state.record(payload)
-            state.mark_processed(cfg.signal_source_id, msg_id)
-        except Exception as exc:
-            log_event("handler_error", level="error", error=str(exc))
+    log_event(
+        "listening",
+        source_id=cfg.signal_source_id,
+        raw_fastpath=cfg.tg_raw_fastpath,
+        edits=cfg.signal_handle_edits,
+    )
+    health.set_listening(True)
 
-    log_event("listening", source_id=cfg.signal_source_id)
+    if spilled:
+        try:
+            keep, downgraded = pipeline.screen_replay(spilled)
+            deadline = loop.time() + cfg.spill_replay_timeout_ms / 1000.0
+            failed = await sinks.replay(keep, deadline=deadline)
+            failed += await sinks.replay(downgraded, critical=False, deadline=deadline)
+            spill.replace(failed)
+        finally:
+            pipeline.release_emits()
+        log_event(
+            "spill_replayed",
+            level="warning" if failed else "info",
+            spilled=len(spilled),
+            replayed=len(keep) + len(downgraded) - len(failed),
+            stale_dropped=len(spilled) - len(keep) - len(downgraded),
+            failed=len(failed),
+        )
 
-    # Run until stop_event is set
+    # Run until stop_event is set; drain while the client is still connected
+    # so the Telegram sink can finish its queue.
     async with client:
         await stop_event.wait()
 
-    # Graceful shutdown
-    state.flush()
-    log_event("shutdown_complete")
-    if status_task:
-        status_task.cancel()
-        with contextlib.suppress(Exception):
-            await status_task
-    flush_task.cancel()
-    with contextlib.suppress(Exception):
-        await flush_task
+        # Graceful shutdown, in phases
+        timer = PhaseTimer()
+        with timer.phase("stop_intake"):
+            pipeline.close_intake()
+            health.set_listening(False)
+            for task in (watch_task, flush_task):
+                if task is not None:
+                    task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError, Exception):
+                        await task
+
+        deadline = loop.time() + cfg.shutdown_drain_timeout_ms / 1000.0
+        with timer.phase("drain") as info:
+            info["handlers_done"] = await pipeline.drain(deadline - loop.time())
+            info["sinks_done"] = await sinks.drain(deadline - loop.time())
+
+        with timer.phase("spill") as info:
+            # Collect in-flight sends before cancelling their handlers
+            pending = sinks.take_pending()
+            await pipeline.cancel_inflight()
+            for payload, critical in pipeline.take_unsent():
+                pending += [(name, payload) for name in sinks.targets(critical=critical)]
+            info["events"] = spill.write(pending)
+
+    with timer.phase("close"):
+        await sinks.aclose()
+        if enricher is not None:
+            await enricher.aclose()
+        for task in (status_task, health_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+        await health.aclose()
+
+    with timer.phase("flush_state"):
+        state.flush()
+        if journal is not None:
+            await asyncio.to_thread(journal.close, 5.0)
+        telemetry.flush_suppressed()
+    loop_monitor.stop()
+    log_event("shutdown_complete", total_ms=timer.total_ms, phases=timer.phases)
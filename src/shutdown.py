@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from .state import atomic_write_text
+from .telemetry import log_event
+
+SPILL_FILE = "spill.jsonl"
+
+
+class PhaseTimer:
+    """Times each shutdown phase and logs it as `shutdown_phase`."""
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **fields: Any) -> Iterator[dict[str, Any]]:
+        """Yields a dict; whatever the phase puts in it is logged alongside the timing."""
+        t0 = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            ms = round((time.perf_counter() - t0) * 1000, 1)
+            self.phases[name] = ms
+            log_event("shutdown_phase", phase=name, ms=ms, **fields)
+
+    @property
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.t0) * 1000, 1)
+
+
+class Spill:
+    """Events that could not be delivered before shutdown, kept for the next start.
+
+    One `{"sink": name, "payload": {...}}` line per event. Writes merge with
+    anything still on disk (a replay that never completed) and are atomic;
+    after a replay, `replace` keeps only the events that failed again.
+    """
+
+    def __init__(self, state_dir: str | Path) -> None:
+        self.path = Path(state_dir) / SPILL_FILE
+
+    def load(self) -> list[tuple[str, dict[str, Any]]]:
+        if not self.path.exists():
+            return []
+        entries: list[tuple[str, dict[str, Any]]] = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+                entries.append((str(record["sink"]), dict(record["payload"])))
+            except (ValueError, KeyError, TypeError):
+                continue
+        return entries
+
+    def write(self, entries: list[tuple[str, dict[str, Any]]]) -> int:
+        merged = self.load() + entries
+        if merged:
+            self._store(merged)
+        return len(entries)
+
+    def replace(self, entries: list[tuple[str, dict[str, Any]]]) -> None:
+        """Atomically swap the file's contents for `entries` (removing it if empty)."""
+        if entries:
+            self._store(entries)
+        else:
+            self.clear()
+
+    def _store(self, entries: list[tuple[str, dict[str, Any]]]) -> None:
+        atomic_write_text(
+            self.path,
+            "".join(
+                json.dumps({"sink": sink, "payload": payload}, separators=(",", ":"), default=str)
+                + "\n"
+                for sink, payload in entries
+            ),
+        )
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
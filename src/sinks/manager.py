@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+
+from ..config import Config
+from ..metrics import LatencyWindow
+from ..telemetry import log_event
+from .shm_ring import RingSink
+from .stdout import StdoutSink
+from .telegram import TelegramSink
+from .uds import UnixSocketSink
+from .webhook import WebhookSink
+
+# Sinks declare `priority` (and, for best-effort sinks, lane `concurrency`) as
+# class attributes; anything that does not is treated as trade-critical.
+CRITICAL = "critical"
+BEST_EFFORT = "best_effort"
+
+
+class EventSink(Protocol):
+    async def emit(self, payload: dict[str, Any]) -> None: ...
+
+
+def _stdout_spec(cfg: Config) -> tuple[Any, ...] | None:
+    return ("stdout",) if cfg.event_sink_stdout else None
+
+
+def _webhook_spec(cfg: Config) -> tuple[Any, ...] | None:
+    if not cfg.event_webhook_url:
+        return None
+    return (
+        cfg.event_webhook_url,
+        cfg.event_webhook_secret,
+        cfg.event_webhook_timeout_ms,
+        cfg.event_webhook_max_retries,
+    )
+
+
+def _local_spec(cfg: Config) -> tuple[Any, ...] | None:
+    # Only the fields the active mode uses, so e.g. a socket timeout change
+    # never rebuilds a ring sink.
+    if not cfg.event_uds_path:
+        return None
+    if cfg.event_uds_mode == "ring":
+        return (cfg.event_uds_path, "ring", cfg.event_ring_size_bytes)
+    return (
+        cfg.event_uds_path,
+        cfg.event_uds_mode,
+        cfg.event_uds_timeout_ms,
+        cfg.event_uds_max_retries,
+    )
+
+
+def _telegram_spec(cfg: Config) -> tuple[Any, ...] | None:
+    if not cfg.tg_forward_chats:
+        return None
+    return (
+        tuple(cfg.tg_forward_chats),
+        cfg.tg_forward_mode,
+        cfg.tg_forward_min_interval_ms,
+        cfg.tg_forward_max_batch,
+        cfg.tg_forward_queue_size,
+    )
+
+
+def _build_stdout(cfg: Config) -> EventSink:
+    return StdoutSink()
+
+
+def _build_webhook(cfg: Config) -> EventSink:
+    assert cfg.event_webhook_url
+    return WebhookSink(
+        cfg.event_webhook_url,
+        secret=cfg.event_webhook_secret,
+        timeout_ms=cfg.event_webhook_timeout_ms,
+        max_retries=cfg.event_webhook_max_retries,
+    )
+
+
+def _build_local(cfg: Config) -> EventSink:
+    assert cfg.event_uds_path
+    if cfg.event_uds_mode == "ring":
+        return RingSink(cfg.event_uds_path, size_bytes=cfg.event_ring_size_bytes)
+    return UnixSocketSink(
+        cfg.event_uds_path,
+        timeout_ms=cfg.event_uds_timeout_ms,
+        max_retries=cfg.event_uds_max_retries,
+    )
+
+
+def _build_telegram(cfg: Config) -> EventSink:
+    return TelegramSink(
+        cfg.tg_forward_chats,
+        mode=cfg.tg_forward_mode,
+        min_interval_ms=cfg.tg_forward_min_interval_ms,
+        max_batch=cfg.tg_forward_max_batch,
+        queue_size=cfg.tg_forward_queue_size,
+    )
+
+
+SpecFn = Callable[[Config], tuple[Any, ...] | None]
+BuildFn = Callable[[Config], EventSink]
+
+# name -> (config fields the sink is built from, builder)
+SINK_REGISTRY: dict[str, tuple[SpecFn, BuildFn]] = {
+    "stdout": (_stdout_spec, _build_stdout),
+    "webhook": (_webhook_spec, _build_webhook),
+    "local": (_local_spec, _build_local),
+    "telegram": (_telegram_spec, _build_telegram),
+}
+
+
+@dataclass
+class _SinkSlot:
+    name: str
+    sink: EventSink
+    spec: tuple[Any, ...] | None
+    inflight: int = 0
+    # id(payload) -> payload for sends that have not returned yet (spilled on shutdown)
+    pending: dict[int, dict[str, Any]] = field(default_factory=dict)
+    retired: bool = False
+    drained: asyncio.Event = field(default_factory=asyncio.Event)
+    latency: LatencyWindow = field(default_factory=LatencyWindow)
+    # Delivery health as seen by the manager (a sink signals failure by raising)
+    consecutive_failures: int = 0
+    last_success_at: float | None = None
+    last_failure_at: float | None = None
+    last_error: str | None = None
+
+    @property
+    def priority(self) -> str:
+        return str(getattr(self.sink, "priority", CRITICAL))
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(getattr(self.sink, "concurrency", 1)))
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "consecutive_failures": self.consecutive_failures,
+            "last_success_at": self.last_success_at,
+            "last_failure_at": self.last_failure_at,
+            "last_error": self.last_error,
+        }
+
+
+_Deliver = Callable[[_SinkSlot, dict[str, Any]], Any]
+
+
+class _Lane:
+    """Bounded queue plus worker tasks feeding one best-effort sink.
+
+    The lane outlives reloads: workers always deliver to the lane's current
+    slot, so swapping the sink does not lose queued events.
+    """
+
+    def __init__(self, slot: _SinkSlot, maxsize: int, deliver: _Deliver) -> None:
+        self.slot = slot
+        self._deliver = deliver
+        self._queue: asyncio.Queue[tuple[dict[str, Any], int]] = asyncio.Queue(maxsize)
+        self._workers: list[asyncio.Task[None]] = []
+        self.dropped = 0
+        self.delivered = 0
+        # enqueue -> delivered, so queueing delay is visible too
+        self.latency = LatencyWindow()
+
+    def offer(self, payload: dict[str, Any]) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.slot.concurrency)
+            ]
+        try:
+            self._queue.put_nowait((payload, time.perf_counter_ns()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _work(self) -> None:
+        while True:
+            payload, enqueued = await self._queue.get()
+            try:
+                await self._deliver(self.slot, payload)
+                self.delivered += 1
+                self.latency.record(time.perf_counter_ns() - enqueued)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "priority": BEST_EFFORT,
+            "concurrency": len(self._workers) or self.slot.concurrency,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "latency": self.latency.snapshot(),
+            **self.slot.health(),
+        }
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    def take_queued(self) -> list[dict[str, Any]]:
+        """Remove and return everything still waiting in the queue."""
+        items = []
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait()[0])
+            self._queue.task_done()
+        return items
+
+    async def aclose(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+class SinkManager:
+    """Owns the configured sinks, their priority lanes and reload swaps.
+
+    Critical sinks (the executor webhook / local socket) are awaited directly,
+    before anything else, with no task creation when there is only one.
+    Best-effort sinks (stdout, telegram) are fed through bounded background lanes that
+    drop and count when full. Reload rebuilds a sink only when the config fields
+    it was built from changed; the replaced sink finishes its in-flight sends
+    and is closed once idle. `registry` defaults to SINK_REGISTRY; tests and
+    benchmarks pass their own builders.
+    """
+
+    def __init__(
+        self, cfg: Config, registry: dict[str, tuple[SpecFn, BuildFn]] | None = None
+    ) -> None:
+        self.cfg = cfg
+        self.registry = SINK_REGISTRY if registry is None else registry
+        self.drain_timeout = cfg.sink_drain_timeout_ms / 1000.0
+        self.lane_size = cfg.sink_lane_queue_size
+        self._slots: dict[str, _SinkSlot] = {}
+        self._critical: list[_SinkSlot] = []
+        self._lanes: dict[str, _Lane] = {}
+        self._retiring: set[asyncio.Task[None]] = set()
+        # Replaced slots still finishing their sends (see _close_when_idle)
+        self._retired: list[_SinkSlot] = []
+        # Telegram client for sinks that send through it (see attach_client)
+        self._client: Any = None
+        for name, (spec_of, build) in self.registry.items():
+            spec = spec_of(cfg)
+            if spec is not None:
+                self._slots[name] = _SinkSlot(name, build(cfg), spec)
+        self._rebuild_routes()
+
+    def _rebuild_routes(self) -> None:
+        self._critical = [s for s in self._slots.values() if s.priority != BEST_EFFORT]
+        for name, slot in self._slots.items():
+            if slot.priority != BEST_EFFORT:
+                continue
+            lane = self._lanes.get(name)
+            if lane is None:
+                self._lanes[name] = _Lane(slot, self.lane_size, self._deliver)
+            else:
+                lane.slot = slot
+        stale = [
+            n for n in self._lanes if n not in self._slots or self._slots[n].priority != BEST_EFFORT
+        ]
+        for name in stale:
+            lane = self._lanes.pop(name)
+            self._spawn(lane.aclose())
+
+    def attach_client(self, client: Any) -> None:
+        """Hand the logged-in TelegramClient to sinks that need one, now and after reloads."""
+        self._client = client
+        for slot in self._slots.values():
+            self._attach(slot.sink)
+
+    def _attach(self, sink: Any) -> None:
+        attach = getattr(sink, "attach", None)
+        if attach is not None and self._client is not None:
+            attach(self._client)
+
+    def reload(self, cfg: Config) -> list[str]:
+        """Rebuild only the sinks whose config changed; returns their names.
+
+        Every replacement is built before anything is swapped. If a builder
+        raises, the sinks already built are closed, the current sinks and
+        settings stay in place and nothing is reported as changed.
+        """
+        built: dict[str, _SinkSlot | None] = {}
+        for name, (spec_of, build) in self.registry.items():
+            try:
+                spec = spec_of(cfg)
+                old = self._slots.get(name)
+                if (old.spec if old else None) == spec:
+                    continue
+                built[name] = None if spec is None else _SinkSlot(name, build(cfg), spec)
+            except Exception as exc:
+                log_event("sink_reload_error", level="error", sink=name, error=str(exc))
+                for slot in built.values():
+                    if slot is not None:
+                        self._retire(slot)
+                return []
+
+        self.cfg = cfg
+        self.drain_timeout = cfg.sink_drain_timeout_ms / 1000.0
+        replaced: list[_SinkSlot] = []
+        for name, slot in built.items():
+            old = self._slots.pop(name, None) if slot is None else self._slots.get(name)
+            if slot is not None:
+                self._slots[name] = slot
+                self._attach(slot.sink)
+            if old is not None:
+                replaced.append(old)
+        if built:
+            self._rebuild_routes()
+        for old in replaced:
+            self._retire(old)
+        return list(built)
+
+    def _spawn(self, coro: Any) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:  # no loop: nothing can be in flight
+            coro.close()
+            return
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    def _retire(self, slot: _SinkSlot) -> None:
+        slot.retired = True
+        self._retired.append(slot)
+        self._spawn(self._close_when_idle(slot))
+
+    async def _close_when_idle(self, slot: _SinkSlot) -> None:
+        """Let a retired sink finish in-flight sends and its own queue, then close it."""
+
+        async def idle() -> None:
+            if slot.inflight:
+                await slot.drained.wait()
+            drain = getattr(slot.sink, "drain", None)
+            if drain is not None:
+                await drain()
+
+        try:
+            await asyncio.wait_for(idle(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            log_event("sink_drain_timeout", level="warning", sink=slot.name, inflight=slot.inflight)
+        aclose = getattr(slot.sink, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as exc:
+                log_event("sink_close_error", level="error", error=str(exc))
+        self._retired.remove(slot)
+
+    async def _deliver(self, slot: _SinkSlot, payload: dict[str, Any]) -> bool:
+        """Send to one sink; returns False if it raised (already logged and counted)."""
+        slot.inflight += 1
+        slot.pending[id(payload)] = payload
+        t0 = time.perf_counter_ns()
+        try:
+            await slot.sink.emit(payload)
+        except Exception as exc:
+            slot.consecutive_failures += 1
+            slot.last_failure_at = time.time()
+            slot.last_error = str(exc)
+            log_event("sink_error", level="error", sink=slot.name, error=str(exc))
+            return False
+        else:
+            slot.consecutive_failures = 0
+            slot.last_success_at = time.time()
+            return True
+        finally:
+            slot.latency.record(time.perf_counter_ns() - t0)
+            slot.inflight -= 1
+            slot.pending.pop(id(payload), None)
+            if slot.retired and slot.inflight == 0:
+                slot.drained.set()
+
+    async def emit(self, payload: dict[str, Any], *, critical: bool = True) -> None:
+        """Deliver to critical sinks, then queue for best-effort lanes.
+
+        `critical=False` skips the critical sinks entirely (downgraded events).
+        """
+        crit = self._critical
+        if critical and crit:
+            if len(crit) == 1:
+                await self._deliver(crit[0], payload)
+            else:
+                rest = [asyncio.create_task(self._deliver(s, payload)) for s in crit[1:]]
+                await self._deliver(crit[0], payload)
+                await asyncio.gather(*rest)
+        for lane in self._lanes.values():
+            lane.offer(payload)
+
+    # Shutdown: drain, then spill whatever is left and close
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to `timeout` for lanes, in-flight sends and sink-side queues to empty.
+
+        Returns False if anything is still pending when the deadline passes.
+        """
+
+        async def idle() -> None:
+            await asyncio.gather(*(lane.join() for lane in self._lanes.values()))
+            while any(slot.inflight for slot in self._all_slots()):
+                await asyncio.sleep(0.01)
+            drains = [getattr(slot.sink, "drain", None) for slot in self._all_slots()]
+            await asyncio.gather(*(d() for d in drains if d is not None))
+
+        try:
+            await asyncio.wait_for(idle(), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _all_slots(self) -> list[_SinkSlot]:
+        """Current slots plus replaced ones that have not finished closing."""
+        return [*self._retired, *self._slots.values()]
+
+    def take_pending(self) -> list[tuple[str, dict[str, Any]]]:
+        """(sink name, payload) for every event not yet delivered, oldest first.
+
+        Covers sends still in flight (on replaced sinks too), lane backlogs and
+        queues kept inside sinks (`pending()`); lane backlogs are emptied by this call.
+        """
+        out: list[tuple[str, dict[str, Any]]] = []
+        for slot in self._all_slots():
+            name = slot.name
+            out.extend((name, payload) for payload in slot.pending.values())
+            lane = None if slot.retired else self._lanes.get(name)
+            if lane is not None:
+                out.extend((name, payload) for payload in lane.take_queued())
+            inner = getattr(slot.sink, "pending", None)
+            if inner is not None:
+                out.extend((name, payload) for payload in inner())
+        return out
+
+    def targets(self, *, critical: bool = True) -> list[str]:
+        """Names of the sinks `emit` would hand an event to."""
+        names = [slot.name for slot in self._critical] if critical else []
+        return names + list(self._lanes)
+
+    async def replay(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        *,
+        critical: bool = True,
+        deadline: float | None = None,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Redeliver spilled events, in order, to the sinks they were meant for.
+
+        Each event is awaited on its sink (best-effort ones too, bypassing the
+        lane) so failures are known; returns the entries that failed again.
+        Entries for sinks no longer configured are skipped, and so are critical
+        ones when `critical=False` (downgraded events). Once the loop time
+        passes `deadline` no further entry is tried; those are returned too.
+        """
+        loop = asyncio.get_running_loop()
+        failed: list[tuple[str, dict[str, Any]]] = []
+        for i, (name, payload) in enumerate(entries):
+            if deadline is not None and loop.time() >= deadline:
+                failed.extend(entries[i:])
+                break
+            slot = self._slots.get(name)
+            if slot is None or (not critical and slot.priority != BEST_EFFORT):
+                continue
+            if not await self._deliver(slot, {**payload, "replayed": True}):
+                failed.append((name, payload))
+        return failed
+
+    async def aclose(self) -> None:
+        """Stop lane workers and close every sink (HTTP pools, sockets, schedulers)."""
+        await asyncio.gather(*(lane.aclose() for lane in self._lanes.values()))
+        for slot in self._slots.values():
+            aclose = getattr(slot.sink, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as exc:
+                log_event("sink_close_error", level="error", sink=slot.name, error=str(exc))
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for slot in self._critical:
+            out[slot.name] = {
+                "priority": CRITICAL,
+                "inflight": slot.inflight,
+                "latency": slot.latency.snapshot(),
+                **slot.health(),
+            }
+        for name, lane in self._lanes.items():
+            out[name] = lane.stats()
+        for name, slot in self._slots.items():
+            detail = getattr(slot.sink, "stats", None)
+            if detail is not None and name in out:
+                out[name]["detail"] = detail()
+        return out
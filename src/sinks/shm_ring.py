@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from typing import Any
+
+from ..telemetry import log_event
+
+# Layout of the shared file:
+#   [0:64)    magic, version, capacity
+#   [64:72)   write position (producer-owned, monotonic byte counter)
+#   [128:136) read position (consumer-owned, monotonic byte counter)
+#   [256:...) data region of `capacity` bytes holding [u32 length][body] records
+# Positions live on separate cache lines so producer and consumer never share one.
+MAGIC = b"RLY1"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+POS = struct.Struct("<Q")
+LEN = struct.Struct("<I")
+WRITE_OFF = 64
+READ_OFF = 128
+DATA_OFF = 256
+PAD_MARKER = 0xFFFFFFFF
+
+
+class MmapRing:
+    """Single-producer / single-consumer byte ring over a memory-mapped file.
+
+    Records never straddle the end of the data region: when the tail is too
+    short the producer writes a pad marker and continues from offset zero.
+    """
+
+    def __init__(self, mm: mmap.mmap, capacity: int) -> None:
+        self._mm = mm
+        self._view = memoryview(mm)
+        self.capacity = capacity
+
+    @classmethod
+    def create(cls, path: str, capacity: int) -> MmapRing:
+        """Start a fresh, empty ring at `path`.
+
+        The new file is built aside and renamed into place, so a consumer
+        still mapping an older ring at `path` keeps its unread records.
+        """
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, DATA_OFF + capacity)
+            mm = mmap.mmap(fd, DATA_OFF + capacity)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, capacity)
+        os.replace(tmp, path)
+        return cls(mm, capacity)
+
+    @classmethod
+    def open_or_create(cls, path: str, capacity: int) -> MmapRing:
+        """Reopen the ring at `path` if there is one, positions intact; else create it.
+
+        An existing ring keeps its capacity: resizing would drop records the
+        consumer has not read yet.
+        """
+        try:
+            ring = cls.open(path)
+        except (OSError, ValueError, struct.error):
+            return cls.create(path, capacity)
+        if ring.capacity != capacity:
+            log_event(
+                "ring_capacity_kept",
+                level="warning",
+                path=path,
+                capacity=ring.capacity,
+                requested=capacity,
+            )
+        return ring
+
+    @classmethod
+    def open(cls, path: str) -> MmapRing:
+        fd = os.open(path, os.O_RDWR)
+        try:
+            mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        magic, version, capacity = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a relay ring buffer")
+        return cls(mm, capacity)
+
+    def _pos(self, off: int) -> int:
+        return int(POS.unpack_from(self._mm, off)[0])
+
+    def used(self) -> int:
+        return self._pos(WRITE_OFF) - self._pos(READ_OFF)
+
+    def try_write(self, body: bytes) -> bool:
+        """Append one record; returns False if the ring lacks room for it."""
+        need = LEN.size + len(body)
+        cap = self.capacity
+        if need > cap:
+            return False
+        w = self._pos(WRITE_OFF)
+        free = cap - (w - self._pos(READ_OFF))
+        off = w % cap
+        tail = cap - off
+        pad = tail if tail < need else 0
+        if pad + need > free:
+            return False
+        if pad:
+            if tail >= LEN.size:
+                LEN.pack_into(self._mm, DATA_OFF + off, PAD_MARKER)
+            w += pad
+            off = 0
+        start = DATA_OFF + off
+        LEN.pack_into(self._mm, start, len(body))
+        self._view[start + LEN.size : start + need] = body
+        # Publish only after the record bytes are in place.
+        POS.pack_into(self._mm, WRITE_OFF, w + need)
+        return True
+
+    def read(self) -> bytes | None:
+        """Pop the oldest record, or return None when the ring is empty."""
+        cap = self.capacity
+        r = self._pos(READ_OFF)
+        while r < self._pos(WRITE_OFF):
+            off = r % cap
+            tail = cap - off
+            if tail < LEN.size:
+                r += tail
+                continue
+            (length,) = LEN.unpack_from(self._mm, DATA_OFF + off)
+            if length == PAD_MARKER:
+                r += tail
+                continue
+            start = DATA_OFF + off + LEN.size
+            body = bytes(self._view[start : start + length])
+            POS.pack_into(self._mm, READ_OFF, r + LEN.size + length)
+            return body
+        POS.pack_into(self._mm, READ_OFF, r)
+        return None
+
+    def close(self) -> None:
+        self._view.release()
+        self._mm.close()
+
+
+class RingSink:
+    """Hand events to a co-located consumer through an mmap'd ring buffer.
+
+    Writes never block: when the consumer falls behind the event is dropped,
+    counted and reported as a failed delivery rather than stalling the relay.
+    """
+
+    priority = "critical"
+
+    def __init__(self, path: str, *, size_bytes: int = 4 << 20) -> None:
+        self.path = path
+        self.ring = MmapRing.open_or_create(path, size_bytes)
+        self.dropped = 0
+
+    async def emit(self, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        if not self.ring.try_write(body):
+            self.dropped += 1
+            raise BufferError(f"{self.path}: ring full ({self.dropped} dropped)")
+
+    async def aclose(self) -> None:
+        self.ring.close()
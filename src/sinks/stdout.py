@@ -6,6 +6,10 @@ from ..telemetry import log_event
 
 
 class StdoutSink:
+    # Logging is auxiliary: it runs in a background lane, never on the trade path.
+    priority = "best_effort"
+    concurrency = 1
+
     def __init__(self) -> None:
         pass
 
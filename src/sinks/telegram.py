@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Iterable
+
+from telethon.errors import FloodWaitError
+
+from ..config import TG_FORWARD_MODES
+from ..telemetry import log_event
+
+MAX_MESSAGE_CHARS = 4096
+MAX_FORWARD_IDS = 100
+# Source messages remembered for forward-mode dedupe
+FORWARDED_MEMORY = 1024
+
+
+def format_signal(payload: dict[str, Any]) -> str:
+    """One line per signal for repost mode."""
+    parts = [str(payload["contract_address"])]
+    if payload.get("side"):
+        parts.insert(0, str(payload["side"]).upper())
+    if payload.get("stale"):
+        parts.append("(stale)")
+    return " ".join(parts)
+
+
+class _ChatScheduler:
+    """Queue plus worker for one target chat.
+
+    Sends are spaced by `min_interval`; whatever piles up meanwhile goes out
+    as one coalesced send. A FloodWaitError pauses only this chat for the
+    requested time and puts the batch back at the front of the queue.
+    """
+
+    def __init__(self, sink: TelegramSink, chat: int | str) -> None:
+        self.sink = sink
+        self.chat = chat
+        self._queue: deque[dict[str, Any]] = deque()
+        self._wake = asyncio.Event()
+        # Set whenever the queue is empty and no send is in progress
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self._sending: list[dict[str, Any]] = []
+        self._task: asyncio.Task[None] | None = None
+        self.next_send_at = 0.0
+        self.counters: dict[str, int] = {
+            "sent": 0,
+            "sends": 0,
+            "coalesced": 0,
+            "flood_waits": 0,
+            "failed": 0,
+            "dropped": 0,
+        }
+
+    def offer(self, payload: dict[str, Any]) -> None:
+        if len(self._queue) >= self.sink.queue_size:
+            self._queue.popleft()
+            self.counters["dropped"] += 1
+        self._queue.append(payload)
+        self.idle.clear()
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._queue:
+                delay = self.next_send_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._sending = self.sink.take(self._queue)
+                await self._send(self._sending)
+                self._sending = []
+            self.idle.set()
+
+    def pending(self) -> list[dict[str, Any]]:
+        return self._sending + list(self._queue)
+
+    async def _send(self, batch: list[dict[str, Any]]) -> None:
+        c = self.counters
+        try:
+            await self.sink.send(self.chat, batch)
+        except FloodWaitError as exc:
+            c["flood_waits"] += 1
+            self._queue.extendleft(reversed(batch))
+            self.next_send_at = time.monotonic() + exc.seconds
+            log_event("tg_flood_wait", level="warning", chat=self.chat, seconds=exc.seconds)
+            return
+        except Exception as exc:
+            c["failed"] += len(batch)
+            log_event("tg_send_failed", level="error", chat=self.chat, error=str(exc))
+        else:
+            c["sent"] += len(batch)
+            c["sends"] += 1
+            c["coalesced"] += len(batch) - 1
+        self.next_send_at = time.monotonic() + self.sink.min_interval
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.counters,
+            "queued": len(self._queue),
+            "paused_sec": round(max(0.0, self.next_send_at - time.monotonic()), 3),
+        }
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+class TelegramSink:
+    """Repost or forward parsed signals to Telegram chats via the relay's client.
+
+    `emit` only enqueues, so rate limits and FLOOD_WAIT pauses stay inside the
+    per-chat schedulers and never reach the lane, let alone the webhook path.
+    The client is attached after login (`attach`); until then events queue up.
+    In `forward` mode the original source message is forwarded, batching ids
+    from the same chat into one call, and only once per (chat_id, message_id)
+    even when an edit adds mints; `repost` sends one text line per signal,
+    coalesced into a single message.
+    """
+
+    priority = "best_effort"
+    concurrency = 1
+
+    def __init__(
+        self,
+        chats: Iterable[int | str],
+        *,
+        mode: str = "repost",
+        min_interval_ms: int = 1000,
+        max_batch: int = 10,
+        queue_size: int = 200,
+        client: Any = None,
+    ) -> None:
+        if mode not in TG_FORWARD_MODES:
+            raise ValueError(f"TG_FORWARD_MODE must be one of {TG_FORWARD_MODES}, got {mode!r}")
+        self.mode = mode
+        self.min_interval = min_interval_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.queue_size = queue_size
+        self.client: Any = None
+        self.skipped = 0
+        self.duplicates = 0
+        self._forwarded: OrderedDict[tuple[Any, Any], None] = OrderedDict()
+        self._chats = {chat: _ChatScheduler(self, chat) for chat in chats}
+        if client is not None:
+            self.attach(client)
+
+    def attach(self, client: Any) -> None:
+        """Start sending through `client` (a connected TelegramClient)."""
+        self.client = client
+        for scheduler in self._chats.values():
+            scheduler.start()
+
+    async def emit(self, payload: dict[str, Any]) -> None:
+        if not payload.get("contract_address") or (
+            self.mode == "forward" and not payload.get("chat_id")
+        ):
+            self.skipped += 1
+            return
+        if self.mode == "forward":
+            key = (payload["chat_id"], payload.get("message_id"))
+            if key in self._forwarded:
+                self.duplicates += 1
+                return
+            self._forwarded[key] = None
+            if len(self._forwarded) > FORWARDED_MEMORY:
+                self._forwarded.popitem(last=False)
+        for scheduler in self._chats.values():
+            scheduler.offer(payload)
+
+    def take(self, queue: deque[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Pop the next batch that can go out as a single API call."""
+        batch = [queue.popleft()]
+        if self.mode == "repost":
+            while queue and len(batch) < self.max_batch:
+                batch.append(queue.popleft())
+        else:
+            # One forward call takes ids from a single source chat.
+            limit = min(self.max_batch, MAX_FORWARD_IDS)
+            source = batch[0]["chat_id"]
+            while queue and len(batch) < limit and queue[0]["chat_id"] == source:
+                batch.append(queue.popleft())
+        return batch
+
+    async def send(self, chat: int | str, batch: list[dict[str, Any]]) -> None:
+        if self.mode == "repost":
+            text = "\n".join(format_signal(p) for p in batch)
+            await self.client.send_message(chat, text[:MAX_MESSAGE_CHARS], link_preview=False)
+        else:
+            ids = [int(p["message_id"]) for p in batch]
+            await self.client.forward_messages(chat, ids, from_peer=batch[0]["chat_id"])
+
+    async def drain(self) -> None:
+        """Wait until every chat's queue has been sent."""
+        await asyncio.gather(*(s.idle.wait() for s in self._chats.values()))
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Unsent payloads across chats, each once even if queued for several."""
+        seen: dict[int, dict[str, Any]] = {}
+        for scheduler in self._chats.values():
+            for payload in scheduler.pending():
+                seen.setdefault(id(payload), payload)
+        return list(seen.values())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "attached": self.client is not None,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "chats": {str(chat): s.stats() for chat, s in self._chats.items()},
+        }
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(s.aclose() for s in self._chats.values()))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import struct
+from collections import deque
+from typing import Any
+
+from ..telemetry import log_event
+
+# Frame: 4-byte big-endian body length followed by the JSON body.
+# The consumer answers every frame, in order, with a single ack byte.
+FRAME_HEADER = struct.Struct(">I")
+ACK_OK = b"\x06"
+ACK_NAK = b"\x15"
+MAX_FRAME_BYTES = 1 << 20
+
+
+def encode_frame(payload: dict[str, Any]) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """Read one frame body; raises IncompleteReadError on EOF."""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"frame too large: {length} bytes")
+    return await reader.readexactly(length)
+
+
+class _Connection:
+    """One socket plus the acks it still owes, oldest first.
+
+    Each connection has its own FIFO and reader task, so a reader left over
+    from a dropped socket can never hand its acks to a newer connection's
+    frames. An ack whose sender gave up (timed out) still consumes its slot.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: deque[asyncio.Future[bytes]] = deque()
+        self.closed = False
+        self.ack_task = asyncio.create_task(self._read_acks())
+
+    async def _read_acks(self) -> None:
+        try:
+            while True:
+                ack = await self.reader.readexactly(1)
+                if self.pending:
+                    fut = self.pending.popleft()
+                    if not fut.done():
+                        fut.set_result(ack)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as exc:
+            self.close(exc)
+
+    def close(self, exc: BaseException) -> None:
+        """Fail every frame still waiting on this socket and close it."""
+        self.closed = True
+        while self.pending:
+            fut = self.pending.popleft()
+            if not fut.done():
+                fut.set_exception(ConnectionError(str(exc) or "uds connection lost"))
+        self.writer.close()
+
+
+class UnixSocketSink:
+    """Deliver events over a persistent Unix domain socket connection.
+
+    Frames are pipelined: several emits may be on the wire at once and acks are
+    matched to senders in FIFO order by the connection's reader task, which
+    is also what notices a dead consumer and drops the connection.
+    """
+
+    priority = "critical"
+
+    def __init__(self, path: str, *, timeout_ms: int = 500, max_retries: int = 2) -> None:
+        self.path = path
+        self.timeout = timeout_ms / 1000.0
+        self.max_retries = max_retries
+        self._conn: _Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _ensure_connected(self) -> _Connection:
+        async with self._connect_lock:
+            if self._conn is None or self._conn.closed or self._conn.writer.is_closing():
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.path), self.timeout
+                )
+                self._conn = _Connection(reader, writer)
+            return self._conn
+
+    async def _send(self, frame: bytes) -> bytes:
+        conn = await self._ensure_connected()
+        fut: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+        conn.pending.append(fut)
+        try:
+            conn.writer.write(frame)
+            await conn.writer.drain()
+        except BaseException as exc:
+            # Nobody will await the ack future now; cancel it so failing it stays silent.
+            fut.cancel()
+            if isinstance(exc, (ConnectionError, OSError)):
+                # The socket is gone, so nothing queued on it will be acked either.
+                conn.close(exc)
+            raise
+        # On timeout wait_for cancels `fut`; its late ack is skipped by the reader.
+        return await asyncio.wait_for(fut, self.timeout)
+
+    async def emit(self, payload: dict[str, Any]) -> None:
+        frame = encode_frame(payload)
+        attempt = 0
+        backoff = 0.05
+        while True:
+            try:
+                ack = await self._send(frame)
+                if ack != ACK_OK:
+                    # The consumer parsed and refused the frame; resending will not help.
+                    log_event("uds_emit_rejected", level="warning", path=self.path)
+                return
+            except Exception as exc:
+                # Only this frame failed; other pipelined emits keep waiting on their acks.
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise ConnectionError(f"{self.path}: {exc}") from exc
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+    async def aclose(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        conn.close(ConnectionError("sink closed"))
+        with contextlib.suppress(Exception):
+            await conn.writer.wait_closed()
+        conn.ack_task.cancel()
+        with contextlib.suppress(BaseException):
+            await conn.ack_task
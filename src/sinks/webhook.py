@@ -9,7 +9,18 @@ from typing import Any, Dict, Optional
 import httpx
 
 
+class WebhookDeliveryError(RuntimeError):
+    """The executor did not accept an event (after any retries)."""
+
+
+def _retryable(status_code: int) -> bool:
+    # Server-side trouble and throttling may clear up; other 4xx will not.
+    return status_code >= 500 or status_code == 429
+
+
 class WebhookSink:
+    priority = "critical"
+
     def __init__(
         self,
         url: str,
@@ -33,15 +44,20 @@ class WebhookSink:
         attempt = 0
         backoff = 0.5
         while True:
+            cause: Optional[Exception] = None
             try:
-                await self._client.post(self.url, content=body, headers=headers)
-                return
-            except Exception:
-                attempt += 1
-                if attempt > self.max_retries:
+                response = await self._client.post(self.url, content=body, headers=headers)
+            except Exception as exc:
+                error, retry, cause = str(exc), True, exc
+            else:
+                if response.is_success:
                     return
-                await asyncio.sleep(backoff)
-                backoff *= 2
+                error, retry = f"HTTP {response.status_code}", _retryable(response.status_code)
+            attempt += 1
+            if not retry or attempt > self.max_retries:
+                raise WebhookDeliveryError(error) from cause
+            await asyncio.sleep(backoff)
+            backoff *= 2
 
     async def aclose(self) -> None:
         await self._client.aclose()
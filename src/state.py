@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -9,6 +10,13 @@ from typing import Deque, Dict
 from .telemetry import log_event
 
 
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file and rename, so a crash never leaves a torn file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
 @dataclass
 class StateManager:
     state_dir: Path
@@ -36,8 +44,7 @@ class StateManager:
 
     def flush(self) -> None:
         try:
-            tmp = json.dumps(self.last_seen_by_source)
-            self.last_seen_file.write_text(tmp)
+            atomic_write_text(self.last_seen_file, json.dumps(self.last_seen_by_source))
         except Exception as exc:
             log_event("state_flush_error", level="error", error=str(exc))
 
@@ -2,18 +2,32 @@ from __future__ import annotations
 
 from collections import deque
 from datetime import datetime
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 import uvicorn
 
+from .journal import EventJournal, parse_ts
+
 
 class StatusState:
     def __init__(self, max_items: int = 20) -> None:
         self.started_at = datetime.utcnow()
         self.total_signals = 0
         self.last_event: Optional[Dict[str, Any]] = None
+        # Wall-clock time the last source message or edit arrived (any, not just signals)
+        self.last_update_at: Optional[float] = None
         self.recent: Deque[Dict[str, Any]] = deque(maxlen=max_items)
+        self.sections: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.routes: Dict[str, Callable[..., Any]] = {}
+
+    def add_section(self, name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        """Expose a component's counters under `name` in /status."""
+        self.sections[name] = provider
+
+    def add_route(self, path: str, endpoint: Callable[..., Any]) -> None:
+        """Serve `endpoint` at GET `path`; query parameters come from its signature."""
+        self.routes[path] = endpoint
 
     def record(self, event: Dict[str, Any]) -> None:
         self.total_signals += 1
@@ -26,17 +40,48 @@ def build_app(state: StatusState) -> FastAPI:
 
     @app.get("/status")
     def status() -> Dict[str, Any]:
-        return {
+        body = {
             "started_at": state.started_at.isoformat() + "Z",
             "uptime_sec": (datetime.utcnow() - state.started_at).total_seconds(),
             "total_signals": state.total_signals,
             "last_event": state.last_event,
             "recent": list(state.recent),
         }
+        for name, provider in state.sections.items():
+            body[name] = provider()
+        return body
+
+    for path, endpoint in state.routes.items():
+        app.add_api_route(path, endpoint, methods=["GET"])
 
     return app
 
 
+def events_endpoint(journal: EventJournal) -> Callable[..., Dict[str, Any]]:
+    """GET /events?mint=&source=&since=&until=&limit= backed by the event journal."""
+
+    def events(
+        mint: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        try:
+            since_ts, until_ts = parse_ts(since), parse_ts(until)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"bad timestamp: {exc}") from exc
+        return journal.query(
+            mint=mint,
+            source=source,
+            since=since_ts,
+            until=until_ts,
+            limit=max(1, min(limit, 1000)),
+        )
+
+    return events
+
+
 async def serve_status(host: str, port: int, state: StatusState) -> None:
     config = uvicorn.Config(build_app(state), host=host, port=port, log_level="warning")
     server = uvicorn.Server(config)
@@ -1,17 +1,146 @@
 from __future__ import annotations
 
 import json
+import random
 import sys
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, TextIO
+
+LEVELS: Dict[str, int] = {"debug": 10, "info": 20, "warning": 30, "error": 40, "critical": 50}
+
+
+class _Bucket:
+    __slots__ = ("tokens", "stamp", "suppressed")
+
+    def __init__(self, tokens: float, stamp: float) -> None:
+        self.tokens = tokens
+        self.stamp = stamp
+        self.suppressed = 0
+
+
+class Telemetry:
+    """Filters log events before they are formatted and written.
+
+    Checks run cheapest first: the level threshold, then sampling of the
+    configured high-volume info events, then a per-event-name token bucket.
+    Events dropped by the bucket are counted and reported by
+    `flush_suppressed` as one `log_suppressed` line per event name, so an
+    error storm costs a line per refill instead of a line per message.
+    """
+
+    def __init__(
+        self,
+        *,
+        level: str = "info",
+        rate_per_sec: float = 0.0,
+        burst: int = 50,
+        sample_rate: float = 1.0,
+        sampled_events: Iterable[str] = (),
+        stream: TextIO | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.stream = stream
+        self.clock = clock
+        self.rng = rng
+        self._buckets: Dict[str, _Bucket] = {}
+        self.emitted = 0
+        self.filtered = 0
+        self.sampled_out = 0
+        self.suppressed = 0
+        self.configure(
+            level=level,
+            rate_per_sec=rate_per_sec,
+            burst=burst,
+            sample_rate=sample_rate,
+            sampled_events=sampled_events,
+        )
+
+    def configure(
+        self,
+        *,
+        level: str,
+        rate_per_sec: float,
+        burst: int,
+        sample_rate: float,
+        sampled_events: Iterable[str],
+    ) -> None:
+        """Apply new limits; safe to call on hot reload (counters are kept)."""
+        self.level = level.strip().lower()
+        self.threshold = LEVELS.get(self.level, LEVELS["info"])
+        # 0 disables rate limiting
+        self.rate = max(0.0, rate_per_sec)
+        self.burst = float(max(1, burst))
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.sampled_events: FrozenSet[str] = (
+            frozenset(sampled_events) if self.sample_rate < 1.0 else frozenset()
+        )
+
+    def log(self, event: str, level: str, fields: Dict[str, Any]) -> None:
+        severity = LEVELS.get(level, LEVELS["info"])
+        if severity < self.threshold:
+            self.filtered += 1
+            return
+        if (
+            event in self.sampled_events
+            and severity <= LEVELS["info"]
+            and self.rng() >= self.sample_rate
+        ):
+            self.sampled_out += 1
+            return
+        if self.rate:
+            now = self.clock()
+            bucket = self._buckets.get(event)
+            if bucket is None:
+                bucket = self._buckets[event] = _Bucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.stamp) * self.rate)
+                bucket.stamp = now
+            if bucket.tokens < 1.0:
+                bucket.suppressed += 1
+                self.suppressed += 1
+                return
+            bucket.tokens -= 1.0
+        self.write(event, level, fields)
+
+    def write(self, event: str, level: str, fields: Dict[str, Any]) -> None:
+        record: Dict[str, Any] = {
+            "ts": datetime.utcnow().isoformat() + "Z",
+            "level": level,
+            "event": event,
+        }
+        record.update(fields)
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        stream.flush()
+        self.emitted += 1
+
+    def flush_suppressed(self) -> int:
+        """Write a `log_suppressed` summary for each event dropped since the last call."""
+        total = 0
+        for name, bucket in list(self._buckets.items()):
+            if bucket.suppressed:
+                count, bucket.suppressed = bucket.suppressed, 0
+                total += count
+                self.write("log_suppressed", "warning", {"suppressed_event": name, "count": count})
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "emitted": self.emitted,
+            "filtered": self.filtered,
+            "sampled_out": self.sampled_out,
+            "suppressed": self.suppressed,
+            "suppressed_pending": {
+                n: b.suppressed for n, b in self._buckets.items() if b.suppressed
+            },
+        }
+
+
+telemetry = Telemetry()
 
 
 def log_event(event: str, level: str = "info", **fields: Any) -> None:
-    record: Dict[str, Any] = {
-        "ts": datetime.utcnow().isoformat() + "Z",
-        "level": level,
-        "event": event,
-    }
-    record.update(fields)
-    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
-    sys.stdout.flush()
+    telemetry.log(event, level, fields)
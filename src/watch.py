@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Callable
+
+from .telemetry import log_event
+
+# (mtime_ns, size, inode) or None when the file is missing
+Signature = tuple[int, int, int] | None
+
+
+def _signature(path: Path) -> Signature:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class FileWatcher:
+    """Poll files for changes and call `on_change(path)` for each one that changed.
+
+    Polling a handful of stat() calls keeps this dependency-free and cheap; the
+    inode is part of the signature so editors that save via rename are caught.
+    """
+
+    def __init__(
+        self,
+        paths: list[Path],
+        on_change: Callable[[Path], None],
+        interval: float = 2.0,
+    ) -> None:
+        self.paths = paths
+        self.on_change = on_change
+        self.interval = interval
+        self._seen: dict[Path, Signature] = {p: _signature(p) for p in paths}
+
+    def poll(self) -> list[Path]:
+        changed: list[Path] = []
+        for path in self.paths:
+            sig = _signature(path)
+            if sig != self._seen.get(path):
+                self._seen[path] = sig
+                changed.append(path)
+        for path in changed:
+            try:
+                self.on_change(path)
+            except Exception as exc:
+                log_event("watch_callback_error", level="error", path=str(path), error=str(exc))
+        return changed
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                self.poll()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from src.config import Config
+
+@pytest.fixture
+def env(monkeypatch: pytest.MonkeyPatch) -> pytest.MonkeyPatch:
+    monkeypatch.setenv("API_ID", "1")
+    monkeypatch.setenv("API_HASH", "hash")
+    monkeypatch.setenv("SIGNAL_SOURCE_ID", "42")
+    return monkeypatch
+
+def test_from_env_rejects_unknown_choices(env: pytest.MonkeyPatch) -> None:
+    env.setenv("SIGNAL_STALE_ACTION", "ignore")
+    with pytest.raises(ValueError, match="SIGNAL_STALE_ACTION"):
+        Config.from_env()
+    env.setenv("SIGNAL_STALE_ACTION", "drop")
+    env.setenv("TG_FORWARD_MODE", "copy")
+    with pytest.raises(ValueError, match="TG_FORWARD_MODE"):
+        Config.from_env()
+    env.setenv("TG_FORWARD_MODE", "forward")
+    env.setenv("EVENT_UDS_MODE", "dgram")
+    with pytest.raises(ValueError, match="EVENT_UDS_MODE"):
+        Config.from_env()
+    env.setenv("EVENT_UDS_MODE", "ring")
+    env.setenv("LOG_LEVEL", "warn")
+    with pytest.raises(ValueError, match="LOG_LEVEL"):
+        Config.from_env()
+
+def test_config_does_not_import_telethon() -> None:
+    code = "import sys, src.config; sys.exit('telethon' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+def test_hot_reload_is_all_or_nothing(env: pytest.MonkeyPatch) -> None:
+    cfg = Config.from_env()
+    env.setenv("DRY_RUN", "false")
+    env.setenv("EVENT_WEBHOOK_URL", "https://executor/v2")
+    env.setenv("TG_FORWARD_MODE", "copy")
+    with pytest.raises(ValueError):
+        cfg.hot_reload()
+    assert cfg.dry_run is True and cfg.event_webhook_url is None
+    env.setenv("TG_FORWARD_MODE", "forward")
+    def reject(staged: Config) -> None:
+        assert staged.tg_forward_mode == "forward"
+        raise ValueError("rule file does not load")
+    with pytest.raises(ValueError, match="rule file"):
+        cfg.hot_reload(check=reject)
+    assert cfg.dry_run is True and cfg.tg_forward_mode == "repost"
+    cfg.hot_reload()
+    assert (cfg.dry_run, cfg.event_webhook_url, cfg.tg_forward_mode) == (
+        False,
+        "https://executor/v2",
+        "forward",
+    )
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from src.enrich import MintEnricher
+
+MINT = "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"
+
+
+class _StubFetcher:
+    def __init__(self, value: dict[str, Any] | None, delay: float = 0.0) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def __call__(self, mint: str) -> dict[str, Any] | None:
+        self.calls.append(mint)
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_enricher_coalesces_concurrent_lookups_and_caches() -> None:
+    fetch = _StubFetcher({"symbol": "SURVIVE"}, delay=0.01)
+    enricher = MintEnricher(fetch, budget_ms=1000)
+
+    results = await asyncio.gather(*(enricher.enrich(MINT) for _ in range(5)))
+    assert results == [{"symbol": "SURVIVE"}] * 5
+    assert await enricher.enrich(MINT) == {"symbol": "SURVIVE"}
+
+    assert fetch.calls == [MINT]
+    stats = enricher.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+
+
+@pytest.mark.asyncio
+async def test_enricher_caches_unknown_mints_negatively() -> None:
+    fetch = _StubFetcher(None)
+    enricher = MintEnricher(fetch, negative_ttl_sec=60)
+
+    assert await enricher.enrich(MINT) is None
+    assert await enricher.enrich(MINT) is None
+
+    assert fetch.calls == [MINT]
+    assert enricher.counters["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_enricher_budget_returns_unenriched_but_keeps_fetching() -> None:
+    fetch = _StubFetcher({"symbol": "SLOW"}, delay=0.05)
+    enricher = MintEnricher(fetch, budget_ms=5)
+
+    assert await enricher.enrich(MINT) is None
+    assert enricher.counters["timeouts"] == 1
+
+    await asyncio.sleep(0.08)
+    assert await enricher.enrich(MINT) == {"symbol": "SLOW"}
+    assert fetch.calls == [MINT]
+
+
+@pytest.mark.asyncio
+async def test_enricher_evicts_least_recently_used() -> None:
+    fetch = _StubFetcher({"symbol": "X"})
+    enricher = MintEnricher(fetch, max_entries=2)
+
+    for mint in ("a", "b", "a", "c"):
+        await enricher.enrich(mint)
+
+    assert list(enricher._cache) == ["a", "c"]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from telethon import utils
+from telethon.tl import types
+
+from src.fastpath import RawMessageFilter, marked_peer_id
+from src.pipeline import RelayPipeline
+from src.state import StateManager
+from src.status import StatusState
+
+DUMMY_CA = "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"
+CHANNEL = 1357911
+CHANNEL_MARKED = utils.get_peer_id(types.PeerChannel(CHANNEL))
+USER = 4242
+
+
+def _channel_post(msg_id: int, text: str, channel: int = CHANNEL) -> types.UpdateNewChannelMessage:
+    msg = types.Message(
+        id=msg_id,
+        peer_id=types.PeerChannel(channel),
+        date=datetime.now(timezone.utc),
+        message=text,
+        post=True,
+    )
+    return types.UpdateNewChannelMessage(message=msg, pts=1, pts_count=1)
+
+
+def test_marked_peer_id_matches_telethon() -> None:
+    for peer in (types.PeerUser(USER), types.PeerChat(777), types.PeerChannel(CHANNEL)):
+        assert marked_peer_id(peer) == utils.get_peer_id(peer)
+
+
+def test_extracts_matching_channel_post_and_skips_others() -> None:
+    flt = RawMessageFilter([CHANNEL_MARKED])
+
+    raw = flt.extract(_channel_post(5, "hello"))
+    assert raw is not None
+    assert (raw.id, raw.chat_id, raw.sender_id, raw.text) == (
+        5,
+        CHANNEL_MARKED,
+        CHANNEL_MARKED,
+        "hello",
+    )
+
+    assert flt.extract(_channel_post(6, "other", channel=CHANNEL + 1)) is None
+    service = types.MessageService(
+        id=7,
+        peer_id=types.PeerChannel(CHANNEL),
+        date=datetime.now(timezone.utc),
+        action=types.MessageActionPinMessage(),
+    )
+    assert flt.extract(types.UpdateNewChannelMessage(message=service, pts=1, pts_count=1)) is None
+
+
+def test_extracts_short_message_from_user() -> None:
+    flt = RawMessageFilter([USER])
+    update = types.UpdateShortMessage(
+        id=9, user_id=USER, message="hi", pts=1, pts_count=1, date=datetime.now(timezone.utc)
+    )
+
+    raw = flt.extract(update)
+
+    assert raw is not None and raw.sender_id == USER and raw.chat_id == USER
+    update.out = True
+    assert flt.extract(update) is None
+
+
+def test_edits_extracted_only_when_enabled() -> None:
+    post = _channel_post(8, "now with CA").message
+    post.edit_date = datetime.now(timezone.utc)
+    update = types.UpdateEditChannelMessage(message=post, pts=2, pts_count=1)
+
+    assert RawMessageFilter([CHANNEL_MARKED]).extract(update) is None
+    raw = RawMessageFilter([CHANNEL_MARKED], edits=True).extract(update)
+    assert raw is not None and raw.edit_date == post.edit_date
+
+
+@pytest.mark.asyncio
+async def test_pipeline_handle_raw_emits(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    calls = []
+
+    class _Sink:
+        async def emit(self, payload, *, critical=True):  # type: ignore[no-untyped-def]
+            calls.append(payload)
+
+    cfg = SimpleNamespace(
+        signal_source_id=CHANNEL_MARKED,
+        signal_max_age_ms=5000,
+        signal_stale_action="tag",
+        signal_handle_edits=True,
+        signal_edit_cache_size=16,
+        rules_file=None,
+    )
+    state = StateManager(str(tmp_path), "last_seen.json")
+    pipeline = RelayPipeline(cfg, state, _Sink(), StatusState())  # type: ignore[arg-type]
+
+    await pipeline.handle_raw(_channel_post(11, f"Signal\n{DUMMY_CA}\n"))
+    await pipeline.handle_raw(_channel_post(12, f"Signal\n{DUMMY_CA}\n", channel=CHANNEL + 1))
+
+    assert len(calls) == 1
+    assert calls[0]["message_id"] == 11
+    assert calls[0]["chat_id"] == CHANNEL_MARKED
+    assert calls[0]["contract_address"] == DUMMY_CA
+    assert calls[0]["stale"] is False
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.freshness import FreshnessGate, SkewTracker
+
+
+def test_skew_tracker_uses_window_minimum_and_ignores_backlog() -> None:
+    tracker = SkewTracker(window=3, sample_limit_ms=10_000)
+    for lag in (400.0, 250.0, 300.0):
+        tracker.observe(lag)
+    assert tracker.skew_ms == 250.0
+
+    tracker.observe(90_000.0)  # replayed backlog, not a clock sample
+    assert tracker.skew_ms == 250.0
+
+    tracker.observe(500.0)
+    tracker.observe(600.0)  # 250 falls out of the window
+    assert tracker.skew_ms == 300.0
+
+
+def test_skew_tracker_needs_samples_and_clamps_estimate() -> None:
+    tracker = SkewTracker(window=8, max_skew_ms=2_000, min_samples=3)
+    tracker.observe(6_000.0)
+    tracker.observe(7_000.0)
+    assert tracker.skew_ms == 0.0
+
+    tracker.observe(6_500.0)
+    assert tracker.skew_ms == 2_000.0
+
+
+def test_gate_subtracts_skew_before_applying_max_age() -> None:
+    gate = FreshnessGate(max_age_ms=1000, action="tag")
+    sent = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Local clock runs 1.5s ahead of Telegram: raw lag 1.7s is really 200ms.
+    for _ in range(3):
+        gate.tracker.observe(1500.0)
+    fresh = gate.assess(sent, sent.timestamp() + 1.7)
+
+    assert fresh.stale is False
+    assert fresh.lag_ms == pytest.approx(200.0, abs=1.0)
+    assert fresh.message_ts == datetime(2025, 1, 1)
+
+
+def test_gate_judges_reconnect_backlog_against_earlier_samples() -> None:
+    gate = FreshnessGate(max_age_ms=5000, action="drop")
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    # Backlog delivered right after a (re)connect, before any live traffic
+    backlog = [
+        gate.assess(datetime.fromtimestamp(now - age, timezone.utc), now) for age in (9.5, 14.0)
+    ]
+    live = gate.assess(datetime.fromtimestamp(now - 0.1, timezone.utc), now)
+
+    assert [f.lag_ms for f in backlog] == [pytest.approx(9500.0), pytest.approx(14000.0)]
+    assert all(f.stale for f in backlog)
+    assert live.stale is False
+    assert gate.counters["stale_dropped"] == 2
+
+
+def test_gate_rejects_unknown_action() -> None:
+    with pytest.raises(ValueError):
+        FreshnessGate(action="ignore")
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.health import SINK_FAILURE_WINDOW_PROBES, HealthMonitor
+from src.status import StatusState, build_app
+
+
+@pytest.mark.asyncio
+async def test_readiness_tracks_client_sink_and_executor() -> None:
+    executor_calls: list[str] = []
+    executor_up = [True]
+
+    def executor(request: httpx.Request) -> httpx.Response:
+        executor_calls.append(str(request.url))
+        return httpx.Response(200 if executor_up[0] else 503)
+
+    status = StatusState()
+    # Shaped like SinkManager.stats(): only critical sinks gate readiness
+    local = {"priority": "critical", "consecutive_failures": 0, "last_error": None}
+    sinks = {"local": local, "stdout": {"priority": "best_effort", "consecutive_failures": 9}}
+    health = HealthMonitor(
+        status, interval_sec=0.02, executor_url="https://executor/healthz", sinks=lambda: sinks
+    )
+    await health._client.aclose()  # type: ignore[union-attr]
+    health._client = httpx.AsyncClient(transport=httpx.MockTransport(executor))
+    client = SimpleNamespace(connected=False)
+    health.attach_client(SimpleNamespace(is_connected=lambda: client.connected))
+    stop = asyncio.Event()
+    probes = asyncio.create_task(health.run(stop))
+    await asyncio.sleep(0.01)
+    assert not health.ready  # still logging in
+
+    client.connected = True
+    status.last_update_at = time.time() - 3
+    health.set_listening(True)
+    assert health.ready
+    checks = json.loads(health.readyz().body)["checks"]
+    assert checks["updates"]["last_update_age_sec"] == pytest.approx(3, abs=0.5)
+
+    assert checks["sink:local"]["ok"] and "sink:stdout" not in checks
+
+    local.update(
+        consecutive_failures=3, last_failure_at=time.time(), last_error="ring full (3 dropped)"
+    )
+    executor_up[0] = False
+    await asyncio.sleep(0.05)
+    assert not health.ready
+    body = json.loads(health.readyz().body)
+    assert not body["checks"]["sink:local"]["ok"]
+    assert body["checks"]["sink:local"]["consecutive_failures"] == 3
+    assert "ring full" in body["checks"]["sink:local"]["last_error"]
+    assert body["checks"]["executor"]["status_code"] == 503
+
+    # No delivery since (quiet source): the failures age out of the window
+    executor_up[0] = True
+    local["last_failure_at"] = time.time() - SINK_FAILURE_WINDOW_PROBES * health.interval - 1
+    await asyncio.sleep(0.05)
+    assert health.ready
+
+    calls = len(executor_calls)
+    for _ in range(50):
+        health.readyz()
+    assert len(executor_calls) == calls  # endpoints never probe
+
+    stop.set()
+    await probes
+    await health.aclose()
+
+
+def test_health_routes_on_status_server() -> None:
+    status = StatusState()
+    health = HealthMonitor(status, interval_sec=60)
+    health.attach_client(SimpleNamespace(is_connected=lambda: True))
+    status.add_route("/healthz", health.healthz)
+    status.add_route("/readyz", health.readyz)
+    app = TestClient(build_app(status))
+
+    assert app.get("/healthz").json() == {"status": "ok"}
+    not_ready = app.get("/readyz")
+    assert not_ready.status_code == 503
+    assert not_ready.json()["checks"]["listening"] == {"ok": False}
+
+    health.set_listening(True)
+    assert app.get("/readyz").status_code == 200
+    health.checked_at -= 600  # probe loop died
+    assert app.get("/healthz").status_code == 503
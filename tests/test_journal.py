@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from src.journal import EventJournal
+from src.status import StatusState, build_app, events_endpoint
+
+DAY1 = datetime(2026, 3, 1, 12, tzinfo=timezone.utc).timestamp()
+DAY2 = datetime(2026, 3, 2, 12, tzinfo=timezone.utc).timestamp()
+
+
+def _event(i: int, ts: float, mint: str = "MintA", chat_id: int = -100) -> dict[str, Any]:
+    stamp = datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    return {"ts": stamp, "message_id": i, "chat_id": chat_id, "contract_address": mint}
+
+
+def test_journal_indexes_and_queries_active_segment(tmp_path: Path) -> None:
+    journal = EventJournal(tmp_path, block_events=4, clock=lambda: DAY1)
+    journal.start()
+    for i in range(20):
+        journal.append(_event(i, DAY1 + i, mint="MintB" if i % 10 == 3 else "MintA"))
+    assert journal.flush(5)
+
+    hits = journal.query(mint="MintB")
+    assert [e["message_id"] for e in hits["events"]] == [3, 13]
+    assert hits["blocks_scanned"] == 2  # of 5
+
+    recent = journal.query(since=DAY1 + 15, limit=3)
+    assert [e["message_id"] for e in recent["events"]] == [15, 16, 17]
+    assert recent["truncated"] is True
+    assert journal.query(source="-999")["events"] == []
+    journal.close(5)
+
+
+def test_journal_compresses_closed_day_and_recovers(tmp_path: Path) -> None:
+    now = [DAY1]
+    journal = EventJournal(tmp_path, block_events=4, clock=lambda: now[0])
+    journal.start()
+    for i in range(10):
+        journal.append(_event(i, DAY1 + i, mint=f"Mint{i % 5}", chat_id=-100 - i % 2))
+    assert journal.flush(5)
+    now[0] = DAY2
+    journal.append(_event(100, DAY2, mint="Mint1"))
+    assert journal.flush(5)
+    journal.close(5)
+
+    assert not (tmp_path / "events-20260301.jsonl").exists()
+    assert (tmp_path / f"events-20260301{journal.codec.suffix}").exists()
+    assert (tmp_path / "events-20260301.idx.json").exists()
+
+    # Leave a torn write at the end of today's segment; it is dropped on restart.
+    with (tmp_path / "events-20260302.jsonl").open("ab") as f:
+        f.write(b'{"ts": "2026-03-')
+    reopened = EventJournal(tmp_path, block_events=4, clock=lambda: DAY2)
+    reopened.start()
+    reopened.append(_event(101, DAY2 + 1, mint="Mint1"))
+    assert reopened.flush(5)
+
+    hits = reopened.query(mint="Mint1", source="-101")
+    assert [e["message_id"] for e in hits["events"]] == [1]
+    assert [e["message_id"] for e in reopened.query(mint="Mint1")["events"]] == [1, 6, 100, 101]
+    assert reopened.query(since=DAY2)["blocks_scanned"] == 1
+    reopened.close(5)
+
+
+def test_journal_prunes_by_event_ts_not_write_order(tmp_path: Path) -> None:
+    now = [DAY1]
+    journal = EventJournal(tmp_path, block_events=4, clock=lambda: now[0])
+    journal.start()
+    journal.append(_event(1, DAY1 + 50))
+    journal.append(_event(2, DAY1 + 10))  # replayed after a restart, older than the first
+    assert journal.flush(5)
+    now[0] = DAY2
+    journal.append(_event(3, DAY2 + 5))
+    journal.append(_event(4, DAY1 + 20))  # day-old event written into today's segment
+    assert journal.flush(5)
+
+    window = journal.query(since=DAY1 + 5, until=DAY1 + 30)
+    assert [e["message_id"] for e in window["events"]] == [2, 4]
+    assert journal.query(since=DAY2)["blocks_scanned"] == 1
+    journal.close(5)
+
+
+def test_events_route_on_status_server(tmp_path: Path) -> None:
+    journal = EventJournal(tmp_path, clock=lambda: DAY1)
+    journal.start()
+    journal.append(_event(1, DAY1))
+    assert journal.flush(5)
+    state = StatusState()
+    state.add_route("/events", events_endpoint(journal))
+    client = TestClient(build_app(state))
+
+    body = client.get("/events", params={"mint": "MintA", "since": "2026-03-01T00:00:00Z"}).json()
+    assert [e["message_id"] for e in body["events"]] == [1]
+    assert client.get("/events", params={"since": "yesterday"}).status_code == 400
+    journal.close(5)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import marshal
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.loopmon import LoopMonitor, profile_endpoint
+
+
+def _block_the_loop(monitor: LoopMonitor, now: list[float], seconds: float) -> None:
+    """Hold the loop while `seconds` pass on the fake clock, until the watchdog sees it."""
+    now[0] += seconds
+    deadline = time.monotonic() + 5
+    while monitor.stalled_since is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+async def _busy(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        sum(range(2_000_000))
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_reported_with_blocking_frame() -> None:
+    now = [0.0]
+    monitor = LoopMonitor(interval_ms=20, stall_ms=50, clock=lambda: now[0])
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    _block_the_loop(monitor, now, 0.3)
+    for _ in range(500):  # the watchdog records the stall once the heartbeat resumes
+        if monitor.stalls:
+            break
+        await asyncio.sleep(0.01)
+    monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 1
+    assert stats["recent_stalls"][0]["top"].startswith("test_loopmon.py:_block_the_loop")
+    # 300ms of silence minus the 20ms interval the heartbeat was due anyway
+    assert stats["recent_stalls"][0]["ms"] == 280
+    assert stats["max_lag_ms"] == 280
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_formats() -> None:
+    monitor = LoopMonitor()
+    monitor.start()
+    endpoint = profile_endpoint(monitor)
+    stop = asyncio.Event()
+    worker = asyncio.create_task(_busy(stop))
+
+    text = await asyncio.to_thread(endpoint, 0.2, "text")
+    collapsed = await asyncio.to_thread(endpoint, 0.2, "collapsed")
+    raw = await asyncio.to_thread(endpoint, 0.2, "pstats")
+    stop.set()
+    await worker
+    monitor.stop()
+
+    assert b"_busy" in text.body and b"function calls" in text.body
+    assert b"test_loopmon.py:_busy" in collapsed.body
+    assert any(key[2] == "_busy" for key in marshal.loads(raw.body))
+    with pytest.raises(HTTPException):
+        endpoint(1.0, "svg")
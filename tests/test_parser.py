@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from src.parser import parse_signal
+from src.parser import parse_mints, parse_signal
 
 DUMMY_CA = "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"
 
@@ -50,3 +50,9 @@ def test_parser_ignores_embedded_urls() -> None:
     )
     p = parse_signal(text)
     assert p.contract_address == DUMMY_CA
+
+
+def test_parse_mints_returns_distinct_addresses_in_order() -> None:
+    other = "Zz9yXwVuTsRqPnMkJhGfEdCbA98765432abcdefg"
+    text = "\n".join([other, DUMMY_CA, other, ""])
+    assert parse_mints(text) == [other, DUMMY_CA]
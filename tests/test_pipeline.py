@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.enrich import MintEnricher
+from src.pipeline import RelayPipeline
+from src.state import StateManager
+from src.status import StatusState
+
+DUMMY_CA = "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"
+SOURCE_ID = 4242
+
+
+class _RecordingSink:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+        self.critical: list[bool] = []
+
+    async def emit(self, payload: dict[str, Any], *, critical: bool = True) -> None:
+        self.calls.append(payload)
+        self.critical.append(critical)
+
+
+def _event(msg_id: int, text: str, age_sec: float = 0.0) -> SimpleNamespace:
+    date = datetime.now(timezone.utc) - timedelta(seconds=age_sec)
+    return SimpleNamespace(
+        message=SimpleNamespace(id=msg_id, date=date),
+        chat_id=SOURCE_ID,
+        sender_id=SOURCE_ID,
+        raw_text=text,
+    )
+
+
+def _pipeline(tmp_path, action: str = "tag", rules_file: str | None = None, **kwargs: Any) -> tuple[RelayPipeline, _RecordingSink]:  # type: ignore[no-untyped-def]
+    cfg = SimpleNamespace(
+        signal_source_id=SOURCE_ID,
+        signal_max_age_ms=5000,
+        signal_stale_action=action,
+        signal_handle_edits=True,
+        signal_edit_cache_size=16,
+        rules_file=rules_file,
+    )
+    sink = _RecordingSink()
+    state = StateManager(str(tmp_path), "last_seen.json")
+    return RelayPipeline(cfg, state, sink, StatusState(), **kwargs), sink  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_emits_parsed_signal_once(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    pipeline, sink = _pipeline(tmp_path)
+
+    await pipeline.handle(_event(10, f"Signal\n{DUMMY_CA}\n"))
+    await pipeline.handle(_event(10, f"Signal\n{DUMMY_CA}\n"))
+
+    assert len(sink.calls) == 1
+    assert sink.calls[0]["contract_address"] == DUMMY_CA
+    assert sink.calls[0]["message_id"] == 10
+    assert pipeline.status.total_signals == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_reports_stage_timings(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    seen: list[str] = []
+    pipeline, _ = _pipeline(tmp_path, observe=lambda stage, ns: seen.append(stage))
+
+    await pipeline.handle(_event(11, DUMMY_CA))
+
+    assert seen == ["extract", "parse", "enrich", "emit", "record", "total"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_tags_stale_signals(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    pipeline, sink = _pipeline(tmp_path)
+
+    await pipeline.handle(_event(20, DUMMY_CA))
+    await pipeline.handle(_event(21, DUMMY_CA, age_sec=120))
+
+    assert [c["stale"] for c in sink.calls] == [False, True]
+    assert sink.calls[1]["lag_ms"] > 100_000
+    assert pipeline.freshness.counters["stale_tagged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_or_downgrades_stale_signals(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    dropping, dropped_sink = _pipeline(tmp_path / "drop", action="drop")
+    await dropping.handle(_event(30, DUMMY_CA, age_sec=120))
+    assert dropped_sink.calls == []
+    assert not dropping.state.should_process(SOURCE_ID, 30)
+
+    downgrading, downgraded_sink = _pipeline(tmp_path / "downgrade", action="downgrade")
+    await downgrading.handle(_event(31, DUMMY_CA, age_sec=120))
+    assert downgraded_sink.critical == [False]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_attaches_mint_metadata(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    async def fetch(mint: str) -> dict[str, Any] | None:
+        return {"symbol": "SURVIVE", "mint": mint}
+
+    pipeline, sink = _pipeline(tmp_path, enricher=MintEnricher(fetch))
+
+    await pipeline.handle(_event(40, DUMMY_CA))
+
+    assert sink.calls[0]["mint_meta"] == {"symbol": "SURVIVE", "mint": DUMMY_CA}
+
+
+def _edit(msg_id: int, text: str) -> SimpleNamespace:
+    event = _event(msg_id, text, age_sec=30.0)
+    event.message.edit_date = datetime.now(timezone.utc)
+    return event
+
+
+@pytest.mark.asyncio
+async def test_edit_emits_only_newly_appeared_mints(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    other = "Zz9yXwVuTsRqPnMkJhGfEdCbA98765432abcdefg"
+    pipeline, sink = _pipeline(tmp_path)
+
+    await pipeline.handle(_event(30, "loading…"))
+    await pipeline.handle_edit(_edit(30, f"Signal\n{DUMMY_CA}\n"))
+    await pipeline.handle_edit(_edit(30, f"Signal\n{DUMMY_CA}\n"))  # reaction-style no-op
+    await pipeline.handle_edit(_edit(30, f"Signal\n{DUMMY_CA}\n{other}\n"))
+
+    # The first payload is the "loading…" message itself, with no CA.
+    assert [c["contract_address"] for c in sink.calls] == [None, DUMMY_CA, other]
+    assert [c["edited"] for c in sink.calls] == [False, True, True]
+    # Freshness is measured from the edit, not the 30s-old send time.
+    assert sink.calls[1]["stale"] is False
+    assert pipeline.edits is not None
+    assert pipeline.edits.stats()["unchanged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_edit_of_untracked_processed_message_is_ignored(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    pipeline, sink = _pipeline(tmp_path)
+    pipeline.state.mark_processed(SOURCE_ID, 40)  # e.g. seen before a restart
+
+    await pipeline.handle_edit(_edit(40, f"Signal\n{DUMMY_CA}\n"))
+    await pipeline.handle_edit(_edit(41, f"Signal\n{DUMMY_CA}\n"))  # never seen: treat as new
+
+    assert [c["message_id"] for c in sink.calls] == [41]
+    assert pipeline.edits is not None
+    assert pipeline.edits.stats()["untracked"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rules_drop_before_emit_and_tag_side(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    rules = tmp_path / "rules.json"
+    rules.write_text(
+        '{"sources": {"*": [{"name": "rug", "action": "exclude", "keywords": ["rug"]},'
+        ' {"name": "ape", "keywords": ["ape"], "side": "buy"}]}}'
+    )
+    pipeline, sink = _pipeline(tmp_path, rules_file=str(rules))
+
+    await pipeline.handle(_event(50, f"ape\n{DUMMY_CA}\n"))
+    await pipeline.handle(_event(51, f"rug warning\n{DUMMY_CA}\n"))
+    await pipeline.handle(_event(51, f"rug warning\n{DUMMY_CA}\n"))
+
+    assert [c["message_id"] for c in sink.calls] == [50]
+    assert (sink.calls[0]["rule"], sink.calls[0]["side"]) == ("ape", "buy")
+    assert pipeline.rules is not None and pipeline.rules.counters["excluded"] == 1
+
+
+class _GatedSink(_RecordingSink):
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def emit(self, payload: dict[str, Any], *, critical: bool = True) -> None:
+        await self.gate.wait()
+        await super().emit(payload, critical=critical)
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_intake_and_drains_running_handlers(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    pipeline, _ = _pipeline(tmp_path)
+    sink = pipeline.sinks = _GatedSink()
+    running = asyncio.create_task(pipeline.handle(_event(60, f"{DUMMY_CA}\n")))
+    await asyncio.sleep(0)
+
+    pipeline.close_intake()
+    await pipeline.handle(_event(61, f"{DUMMY_CA}\n"))
+    assert not await pipeline.drain(0.01)
+
+    sink.gate.set()
+    assert await pipeline.drain(1.0)
+    await running
+    assert [c["message_id"] for c in sink.calls] == [60]
+    assert pipeline.state.should_process(SOURCE_ID, 61)  # ignored, not marked
+
+
+@pytest.mark.asyncio
+async def test_edit_during_inflight_emit_only_adds_new_mints(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    other = "Zz9yXwVuTsRqPnMkJhGfEdCbA98765432abcdefg"
+    pipeline, _ = _pipeline(tmp_path)
+    sink = pipeline.sinks = _GatedSink()
+    first = asyncio.create_task(pipeline.handle(_event(70, f"Signal\n{DUMMY_CA}\n")))
+    await asyncio.sleep(0)  # parsed and waiting on the sink
+
+    edit = pipeline.handle_edit(_edit(70, f"Signal\n{DUMMY_CA}\n{other}\n"))
+    duplicate = pipeline.handle(_event(70, f"Signal\n{DUMMY_CA}\n"))
+    later = asyncio.gather(edit, duplicate)
+    await asyncio.sleep(0)
+    sink.gate.set()
+    await asyncio.gather(first, later)
+
+    assert sorted((c["contract_address"], c["edited"]) for c in sink.calls) == [
+        (DUMMY_CA, False),
+        (other, True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_held_emits_wait_for_replay_and_cancelled_ones_are_kept(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    pipeline, sink = _pipeline(tmp_path)
+    pipeline.hold_emits()
+    waiting = asyncio.create_task(pipeline.handle(_event(80, f"{DUMMY_CA}\n")))
+    await asyncio.sleep(0)
+    assert sink.calls == []
+
+    pipeline.release_emits()
+    await waiting
+    assert [c["message_id"] for c in sink.calls] == [80]
+
+    # Claimed, then cancelled at shutdown before reaching the sinks
+    pipeline.hold_emits()
+    asyncio.create_task(pipeline.handle(_event(81, f"{DUMMY_CA}\n")))
+    await asyncio.sleep(0)
+    await pipeline.cancel_inflight()
+    assert not pipeline.state.should_process(SOURCE_ID, 81)
+    assert [(p["message_id"], critical) for p, critical in pipeline.take_unsent()] == [(81, True)]
+    assert pipeline.take_unsent() == []
+
+
+def test_spilled_events_are_rechecked_for_freshness(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    def spilled(msg_id: int, age_sec: float | None) -> tuple[str, dict[str, Any]]:
+        sent = datetime.now(timezone.utc) - timedelta(seconds=age_sec or 0)
+        ts = sent.replace(tzinfo=None).isoformat() + "Z" if age_sec is not None else None
+        return "webhook", {"message_id": msg_id, "message_ts": ts, "lag_ms": 40.0, "stale": False}
+
+    entries = [spilled(1, 60), spilled(2, 1), spilled(3, None)]
+    dropping, _ = _pipeline(tmp_path / "drop", action="drop")
+    keep, downgraded = dropping.screen_replay(entries)
+    assert [p["message_id"] for _, p in keep] == [2, 3] and downgraded == []
+    assert keep[0][1]["lag_ms"] >= 1000 and keep[1][1]["lag_ms"] == 40.0
+
+    downgrading, _ = _pipeline(tmp_path / "downgrade", action="downgrade")
+    keep, downgraded = downgrading.screen_replay(entries)
+    assert [p["message_id"] for _, p in keep] == [2, 3]
+    assert [(p["message_id"], p["stale"]) for _, p in downgraded] == [(1, True)]
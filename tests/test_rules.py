@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.rules import RuleError, RulesEngine, compile_rules, required_literal
+
+SOURCE = -1001234
+
+
+def _write(path: Path, sources: dict[str, list[dict[str, object]]]) -> str:
+    path.write_text(json.dumps({"sources": sources}))
+    return str(path)
+
+
+def test_exclude_wins_and_include_gates(tmp_path: Path) -> None:
+    engine = RulesEngine(
+        _write(
+            tmp_path / "rules.json",
+            {
+                "*": [{"name": "rug", "action": "exclude", "keywords": ["rug", "sell now"]}],
+                str(SOURCE): [
+                    {"name": "ape", "keywords": ["ape"], "side": "buy"},
+                    {"name": "mc", "patterns": [r"mc:\s*\$\d+"]},
+                    {"name": "dump", "action": "tag", "keywords": ["dump"], "side": "sell"},
+                ],
+            },
+        )
+    )
+
+    assert engine.evaluate(SOURCE, 1, "APE in now").side == "buy"
+    assert engine.evaluate(SOURCE, 1, "ape, might RUG").rule == "rug"
+    assert not engine.evaluate(SOURCE, 1, "please SELL NOW").allowed
+    assert not engine.evaluate(SOURCE, 1, "just chatter").allowed
+    verdict = engine.evaluate(SOURCE, 1, "MC: $76 then dump")
+    assert (verdict.allowed, verdict.rule, verdict.side) == (True, "mc", "sell")
+    # Sources without their own rules only get the shared ones.
+    assert engine.evaluate(999, 1, "just chatter").allowed
+
+    stats = engine.stats()
+    assert stats["hits"]["rug"] == 2 and stats["hits"]["ape"] == 2
+    assert (stats["excluded"], stats["no_match"]) == (2, 1)
+
+
+def test_sender_allowlist_and_overlapping_patterns() -> None:
+    sets = compile_rules(
+        {
+            "sources": {
+                "1": [
+                    {"name": "trusted", "senders": [7]},
+                    {"name": "buy-now", "patterns": ["buy now"]},
+                    {"name": "warn", "action": "exclude", "patterns": ["now rug"]},
+                ]
+            }
+        }
+    )
+    rules = sets["1"]
+
+    assert rules.evaluate("hello", 7)[0].rule == "trusted"
+    assert not rules.evaluate("hello", 8)[0].allowed
+    # The exclude match starts inside the include match and must still be seen.
+    assert rules.evaluate("buy now rug", 8)[0].rule == "warn"
+
+
+def test_keywords_with_punctuation_or_emoji_edges() -> None:
+    rules = compile_rules(
+        {
+            "sources": {
+                "1": [
+                    {"name": "rug", "action": "exclude", "keywords": ["$RUG", "sell!"]},
+                    {"name": "moon", "keywords": ["🚀"], "side": "buy"},
+                ]
+            }
+        }
+    )["1"]
+
+    assert rules.evaluate("going 🚀 now", 1)[0].rule == "moon"
+    assert rules.evaluate("🚀🚀", 1)[0].rule == "moon"
+    assert not rules.evaluate("🚀 but $rug incoming", 1)[0].allowed
+    assert not rules.evaluate("🚀 SELL! SELL!", 1)[0].allowed
+    # Still no match inside a longer word.
+    assert rules.evaluate("🚀 $rugged? sell!er", 1)[0].rule == "moon"
+
+
+def test_bad_rule_file_is_rejected_and_reload_keeps_old_rules(tmp_path: Path) -> None:
+    with pytest.raises(RuleError):
+        compile_rules({"sources": {"1": [{"name": "x", "patterns": ["("]}]}})
+    with pytest.raises(RuleError):
+        compile_rules({"sources": {"1": [{"name": "x", "action": "maybe", "keywords": ["a"]}]}})
+    for bad in ({"senders": ["@caller"]}, {"keywords": 5}, {"keywords": "rug"}, {"patterns": [1]}):
+        with pytest.raises(RuleError):
+            compile_rules({"sources": {"1": [{"name": "x", **bad}]}})
+
+    path = tmp_path / "rules.json"
+    engine = RulesEngine(_write(path, {"1": [{"name": "a", "keywords": ["alpha"]}]}))
+    engine.evaluate(1, None, "alpha")
+    path.write_text("{not json")
+    assert engine.reload() is False
+    assert engine.evaluate(1, None, "alpha").rule == "a"
+
+    _write(path, {"1": [{"name": "a", "keywords": ["beta"]}]})
+    assert engine.reload() is True
+    assert engine.evaluate(1, None, "beta").rule == "a"
+    assert engine.hits["a"] == 3
+
+
+def test_required_literal_is_conservative() -> None:
+    assert required_literal(r"MC:\s*\$\d+") == "mc:"
+    assert required_literal("pumps?") == "pump"
+    assert required_literal("buy|sell") is None
+    assert required_literal(r"(?i)ape") is None
+    assert required_literal("ab") is None
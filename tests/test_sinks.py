@@ -1,14 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import hashlib
 import hmac
+import json
+import tempfile
 from types import SimpleNamespace
 
+import httpx
 import pytest
+from telethon.errors import FloodWaitError
 
+from bench.stubs import StubUdsConsumer
 from src.runner import SinkManager
-from src.sinks.webhook import WebhookSink
+from src.shutdown import Spill
+from src.sinks.manager import SINK_REGISTRY
+from src.sinks.shm_ring import MmapRing, RingSink
+from src.sinks.telegram import TelegramSink
+from src.sinks.uds import ACK_OK, UnixSocketSink, read_frame
+from src.sinks.webhook import WebhookDeliveryError, WebhookSink
 
 
 class _StubClient:
@@ -16,11 +27,12 @@ class _StubClient:
         self._responses = responses
         self.calls: list[tuple[bytes, dict[str, str]]] = []
 
-    async def post(self, url: str, *, content: bytes, headers: dict[str, str]) -> None:
+    async def post(self, url: str, *, content: bytes, headers: dict[str, str]) -> httpx.Response:
         self.calls.append((content, headers))
         outcome = self._responses.pop(0) if self._responses else None
         if isinstance(outcome, BaseException):
             raise outcome
+        return httpx.Response(200)
 
     async def aclose(self) -> None:  # pragma: no cover - best-effort cleanup
         pass
@@ -66,6 +78,31 @@ async def test_webhook_sink_retries_until_success(monkeypatch: pytest.MonkeyPatc
     assert len(stub.calls) == 3
 
 
+@pytest.mark.asyncio
+async def test_webhook_sink_fails_on_error_status(monkeypatch: pytest.MonkeyPatch) -> None:
+    statuses: list[int] = []
+
+    def executor(request: httpx.Request) -> httpx.Response:
+        statuses.append(503 if len(statuses) < 3 else 400)
+        return httpx.Response(statuses[-1])
+
+    async def fake_sleep(_: float) -> None:
+        return
+
+    monkeypatch.setattr("src.sinks.webhook.asyncio.sleep", fake_sleep)
+    sink = WebhookSink("https://gmgn.example/ingest", max_retries=2)
+    await sink._client.aclose()
+    sink._client = httpx.AsyncClient(transport=httpx.MockTransport(executor))
+
+    with pytest.raises(WebhookDeliveryError, match="HTTP 503"):
+        await sink.emit({"message_id": 1})
+    assert statuses == [503, 503, 503]  # first try plus two retries
+    with pytest.raises(WebhookDeliveryError, match="HTTP 400"):
+        await sink.emit({"message_id": 2})
+    assert len(statuses) == 4  # a rejected event is not retried
+    await sink.aclose()
+
+
 class _DummySink:
     def __init__(self) -> None:
         self.calls: list[dict[str, str]] = []
@@ -74,24 +111,532 @@ class _DummySink:
         self.calls.append(payload)
 
 
-@pytest.mark.asyncio
-async def test_sink_manager_emits_to_all_sinks(monkeypatch: pytest.MonkeyPatch) -> None:
-    cfg = SimpleNamespace(
-        event_sink_stdout=True,
-        event_webhook_url="https://gmgn",
-        event_webhook_secret=None,
-        event_webhook_timeout_ms=1500,
-        event_webhook_max_retries=2,
-    )
-    manager = SinkManager(cfg)
+def _take(queue: list[object]) -> object:
+    sink = queue.pop(0)
+    if isinstance(sink, Exception):
+        raise sink
+    return sink
 
+
+def _registry(**sinks: list[object]) -> dict[str, tuple[object, object]]:
+    """Real spec functions, but each build hands out (or raises) the next of the given sinks."""
+    return {
+        name: (SINK_REGISTRY[name][0], lambda cfg, queue=queue: _take(queue))
+        for name, queue in sinks.items()
+    }
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_emits_to_all_sinks() -> None:
     stdout_sink = _DummySink()
     webhook_sink = _DummySink()
-    manager.stdout = stdout_sink  # type: ignore[assignment]
-    manager.webhook = webhook_sink  # type: ignore[assignment]
+    manager = SinkManager(
+        _manager_cfg(), registry=_registry(stdout=[stdout_sink], webhook=[webhook_sink])
+    )
 
     payload = {"contract_address": "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"}
     await manager.emit(payload)
+    await manager.drain(1.0)
 
     assert stdout_sink.calls == [payload]
     assert webhook_sink.calls == [payload]
+
+
+class _FlakySink(_DummySink):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    async def emit(self, payload: dict[str, str]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("executor down")
+        await super().emit(payload)
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_tracks_critical_failures() -> None:
+    manager = SinkManager(_manager_cfg(), registry=_registry(webhook=[_FlakySink(failures=2)]))
+
+    for i in range(2):
+        await manager.emit({"message_id": i})
+    health = manager.stats()["webhook"]
+    assert health["consecutive_failures"] == 2
+    assert health["last_error"] == "executor down" and health["last_success_at"] is None
+
+    await manager.emit({"message_id": 2})
+    assert manager.stats()["webhook"]["consecutive_failures"] == 0
+
+
+@pytest.fixture
+def sock_path():  # type: ignore[no-untyped-def]
+    # AF_UNIX paths are length-limited, so avoid pytest's deep tmp_path.
+    with tempfile.TemporaryDirectory(prefix="relay") as tmpdir:
+        yield f"{tmpdir}/relay.sock"
+
+
+@pytest.mark.asyncio
+async def test_uds_sink_delivers_frames_in_order(sock_path: str) -> None:
+    consumer = StubUdsConsumer(sock_path)
+    await consumer.start()
+    sink = UnixSocketSink(sock_path, timeout_ms=1000)
+    try:
+        await asyncio.gather(*(sink.emit({"message_id": i}) for i in range(20)))
+    finally:
+        await sink.aclose()
+        await consumer.stop()
+
+    assert [e["message_id"] for e in consumer.received] == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_uds_sink_reconnects_after_consumer_restart(sock_path: str) -> None:
+    consumer = StubUdsConsumer(sock_path)
+    await consumer.start()
+    sink = UnixSocketSink(sock_path, timeout_ms=1000, max_retries=3)
+    await sink.emit({"message_id": 1})
+    await consumer.stop()
+
+    restarted = StubUdsConsumer(sock_path)
+    await restarted.start()
+    try:
+        await sink.emit({"message_id": 2})
+    finally:
+        await sink.aclose()
+        await restarted.stop()
+
+    assert [e["message_id"] for e in restarted.received] == [2]
+
+
+@pytest.mark.asyncio
+async def test_uds_sink_slow_ack_only_retries_its_own_frame(sock_path: str) -> None:
+    received: list[int] = []
+    release = asyncio.Event()
+
+    async def ack_all(writer: asyncio.StreamWriter, frames: asyncio.Queue[None]) -> None:
+        await release.wait()
+        while True:
+            await frames.get()
+            writer.write(ACK_OK)
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        frames: asyncio.Queue[None] = asyncio.Queue()
+        acker = asyncio.create_task(ack_all(writer, frames))
+        with contextlib.suppress(asyncio.IncompleteReadError, ConnectionError):
+            while True:
+                received.append(json.loads(await read_frame(reader))["message_id"])
+                frames.put_nowait(None)
+                if len(received) == 3:  # frame 0 timed out and was resent
+                    release.set()
+        acker.cancel()
+
+    server = await asyncio.start_unix_server(serve, path=sock_path)
+    sink = UnixSocketSink(sock_path, timeout_ms=500, max_retries=1)
+    try:
+        first = asyncio.create_task(sink.emit({"message_id": 0}))
+        await asyncio.sleep(0.3)
+        second = asyncio.create_task(sink.emit({"message_id": 1}))
+        await asyncio.wait_for(asyncio.gather(first, second), 5)
+    finally:
+        await sink.aclose()
+        server.close()
+        await server.wait_closed()
+
+    # Frame 1 was still within its deadline when frame 0 gave up: no resend.
+    assert received == [0, 1, 0]
+
+
+def test_mmap_ring_wraps_and_reports_full(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    path = str(tmp_path / "relay.ring")
+    writer = MmapRing.create(path, 64)
+    reader = MmapRing.open(path)
+
+    assert writer.try_write(b"a" * 20)
+    assert writer.try_write(b"b" * 20)
+    assert not writer.try_write(b"c" * 20)  # 48 of 64 bytes used
+    assert reader.read() == b"a" * 20
+    assert writer.try_write(b"c" * 20)  # pads the 16-byte tail and wraps
+    assert reader.read() == b"b" * 20
+    assert reader.read() == b"c" * 20
+    assert reader.read() is None
+    writer.close()
+    reader.close()
+
+
+@pytest.mark.asyncio
+async def test_ring_sink_counts_drops_when_full(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    path = str(tmp_path / "relay.ring")
+    sink = RingSink(path, size_bytes=160)
+    payload = {"contract_address": "AbCdEfGhJkMnPqRsTuVwXyZ23456789ABCDEFGH"}
+    await sink.emit(payload)
+    await sink.emit(payload)
+    for _ in range(2):
+        with pytest.raises(BufferError, match="ring full"):
+            await sink.emit(payload)
+
+    reader = MmapRing.open(path)
+    first = reader.read()
+    assert first is not None and json.loads(first) == payload
+    assert sink.dropped == 2
+    reader.close()
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_ring_sink_rebuild_keeps_unread_records(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    path = str(tmp_path / "relay.ring")
+    first = RingSink(path, size_bytes=4096)
+    reader = MmapRing.open(path)
+    await first.emit({"message_id": "1"})
+    await first.aclose()
+
+    # A rebuild (reload, restart) reattaches to the ring the consumer has mapped
+    second = RingSink(path, size_bytes=8192)
+    await second.emit({"message_id": "2"})
+    assert second.ring.capacity == 4096
+    assert [reader.read(), reader.read()] == [b'{"message_id":"1"}', b'{"message_id":"2"}']
+    reader.close()
+    await second.aclose()
+
+
+def test_sink_manager_ring_spec_ignores_stream_settings(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    ring = str(tmp_path / "relay.ring")
+    cfg = _manager_cfg(event_uds_path=ring, event_uds_mode="ring")
+    local = _DummySink()
+    manager = SinkManager(cfg, registry=_registry(local=[local]))
+
+    changed = _manager_cfg(event_uds_path=ring, event_uds_mode="ring", event_uds_timeout_ms=900)
+    assert manager.reload(changed) == []
+
+
+def _manager_cfg(**overrides: object) -> SimpleNamespace:
+    base: dict[str, object] = dict(
+        event_sink_stdout=True,
+        event_webhook_url="https://gmgn/ingest",
+        event_webhook_secret=None,
+        event_webhook_timeout_ms=1500,
+        event_webhook_max_retries=2,
+        event_uds_path=None,
+        event_uds_mode="stream",
+        event_uds_timeout_ms=500,
+        event_uds_max_retries=2,
+        event_ring_size_bytes=4096,
+        sink_drain_timeout_ms=1000,
+        sink_lane_queue_size=10,
+        tg_forward_chats=[],
+        tg_forward_mode="repost",
+        tg_forward_min_interval_ms=1000,
+        tg_forward_max_batch=10,
+        tg_forward_queue_size=200,
+    )
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_reload_keeps_unchanged_sinks() -> None:
+    cfg = _manager_cfg()
+    webhook, stdout = _DummySink(), _BestEffortSink()
+    # One sink each: a rebuild would find the builder's queue empty
+    manager = SinkManager(cfg, registry=_registry(webhook=[webhook], stdout=[stdout]))
+
+    assert manager.reload(_manager_cfg()) == []
+    await manager.emit({"message_id": "1"})
+    assert await manager.drain(1.0)
+    assert webhook.calls == stdout.calls == [{"message_id": "1"}]
+
+
+class _SlowSink:
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.delivered: list[dict[str, str]] = []
+        self.closed = False
+
+    async def emit(self, payload: dict[str, str]) -> None:
+        await self.release.wait()
+        self.delivered.append(payload)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_reload_drains_replaced_sink() -> None:
+    old, new = _SlowSink(), _DummySink()
+    manager = SinkManager(_manager_cfg(), registry=_registry(webhook=[old, new]))
+
+    inflight = asyncio.create_task(manager.emit({"message_id": "1"}))
+    await asyncio.sleep(0)
+    changed = manager.reload(_manager_cfg(event_webhook_url="https://gmgn/v2"))
+
+    assert changed == ["webhook"]
+    await manager.emit({"message_id": "2"})
+    assert new.calls == [{"message_id": "2"}]
+    await asyncio.sleep(0)
+    assert not old.closed  # still sending
+
+    old.release.set()
+    await inflight
+    await manager.aclose()  # waits for the retired sink to close
+    assert old.delivered == [{"message_id": "1"}]
+    assert old.closed
+
+
+class _BestEffortSink(_DummySink):
+    priority = "best_effort"
+    concurrency = 1
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_reload_is_all_or_nothing() -> None:
+    local, webhook, unused = _DummySink(), _DummySink(), _SlowSink()
+    manager = SinkManager(
+        _manager_cfg(event_uds_path="/run/relay-a.sock"),
+        registry=_registry(local=[local, unused], webhook=[webhook, ValueError("bad url")]),
+    )
+
+    changed = manager.reload(
+        _manager_cfg(event_uds_path="/run/relay-b.sock", event_webhook_url="https://gmgn/v2")
+    )
+    assert changed == []
+    await manager.emit({"message_id": "1"})
+    assert local.calls == webhook.calls == [{"message_id": "1"}]
+
+    await manager.aclose()
+    assert unused.closed  # built, then discarded with the failed reload
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_runs_critical_sink_before_best_effort_lane() -> None:
+    order: list[str] = []
+
+    class _Critical:
+        async def emit(self, payload: dict[str, str]) -> None:
+            order.append("critical")
+
+    class _Aux(_BestEffortSink):
+        async def emit(self, payload: dict[str, str]) -> None:
+            order.append("aux")
+
+    manager = SinkManager(
+        _manager_cfg(), registry=_registry(webhook=[_Critical()], stdout=[_Aux()])
+    )
+
+    await manager.emit({"message_id": "1"})
+    assert order == ["critical"]  # aux is queued, not awaited
+    await asyncio.sleep(0)
+    assert order == ["critical", "aux"]
+
+    await manager.emit({"message_id": "2"}, critical=False)
+    await asyncio.sleep(0)
+    assert order == ["critical", "aux", "aux"]
+    assert manager.stats()["stdout"]["delivered"] == 2
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_lane_drops_when_full() -> None:
+    aux = _BestEffortSink()
+    manager = SinkManager(_manager_cfg(sink_lane_queue_size=2), registry=_registry(stdout=[aux]))
+
+    for i in range(5):
+        await manager.emit({"message_id": str(i)})
+    stats = manager.stats()["stdout"]
+    assert stats["dropped"] == 3
+    assert stats["queued"] == 2
+
+    await asyncio.sleep(0)
+    assert [c["message_id"] for c in aux.calls] == ["0", "1"]
+
+
+class _StubTelegramClient:
+    def __init__(self, flood_waits: int = 0) -> None:
+        self.flood_waits = flood_waits
+        self.sent: list[tuple[object, str]] = []
+        self.forwarded: list[tuple[object, list[int], object]] = []
+
+    def _maybe_flood(self) -> None:
+        if self.flood_waits:
+            self.flood_waits -= 1
+            raise FloodWaitError(request=None, capture=0)
+
+    async def send_message(self, chat: object, text: str, **_: object) -> None:
+        self._maybe_flood()
+        self.sent.append((chat, text))
+
+    async def forward_messages(self, chat: object, ids: list[int], from_peer: object) -> None:
+        self._maybe_flood()
+        self.forwarded.append((chat, ids, from_peer))
+
+
+def _signal(message_id: int, chat_id: int = -100, ca: str | None = "Mint") -> dict[str, object]:
+    return {"message_id": message_id, "chat_id": chat_id, "contract_address": ca, "side": None}
+
+
+@pytest.mark.asyncio
+async def test_telegram_sink_coalesces_bursts_per_chat() -> None:
+    client = _StubTelegramClient()
+    sink = TelegramSink(["@a", 42], min_interval_ms=50)
+    for i in range(3):  # queued before login
+        await sink.emit(_signal(i, ca=f"Mint{i}"))
+    await sink.emit(_signal(9, ca=None))
+
+    sink.attach(client)
+    await asyncio.sleep(0.02)
+    for i in range(3, 6):
+        await sink.emit(_signal(i, ca=f"Mint{i}"))
+    await asyncio.sleep(0.1)
+
+    texts = [text for chat, text in client.sent if chat == "@a"]
+    assert texts == ["Mint0\nMint1\nMint2", "Mint3\nMint4\nMint5"]
+    assert len(client.sent) == 4
+    stats = sink.stats()
+    assert stats["skipped"] == 1 and stats["chats"]["42"]["coalesced"] == 4
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_telegram_sink_flood_wait_requeues_and_forward_groups_by_source() -> None:
+    client = _StubTelegramClient(flood_waits=1)
+    sink = TelegramSink([7], mode="forward", min_interval_ms=10, client=client)
+    await sink.emit(_signal(1, chat_id=-100))
+    await sink.emit(_signal(2, chat_id=-100))
+    await sink.emit(_signal(3, chat_id=-200))
+    await asyncio.sleep(0.1)
+
+    assert client.forwarded == [(7, [1, 2], -100), (7, [3], -200)]
+    assert sink.stats()["chats"]["7"]["flood_waits"] == 1
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_telegram_sink_forwards_each_source_message_once() -> None:
+    client = _StubTelegramClient()
+    sink = TelegramSink([7], mode="forward", min_interval_ms=10, client=client)
+    await sink.emit(_signal(1, ca="Mint0"))
+    await sink.emit({**_signal(1, ca="Mint1"), "edited": True})  # edit added a mint
+    await sink.emit(_signal(2, ca="Mint1"))
+    await asyncio.sleep(0.05)
+
+    assert client.forwarded == [(7, [1, 2], -100)]
+    assert sink.stats()["duplicates"] == 1
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_retired_telegram_sink_sends_its_queue_first() -> None:
+    telegram_only = dict(event_sink_stdout=False, event_webhook_url=None, tg_forward_chats=[5])
+    manager = SinkManager(_manager_cfg(**telegram_only, tg_forward_min_interval_ms=50))
+    client = _StubTelegramClient()
+    manager.attach_client(client)
+    await manager.emit(_signal(1, ca="Mint1"))
+    await asyncio.sleep(0.01)
+    await manager.emit(_signal(2, ca="Mint2"))
+    await asyncio.sleep(0.01)  # Mint1 sent, Mint2 waiting out the interval
+
+    changed = manager.reload(_manager_cfg(**telegram_only, tg_forward_min_interval_ms=10))
+    assert changed == ["telegram"]
+    await manager.aclose()  # waits for the retired sink
+
+    assert client.sent == [(5, "Mint1"), (5, "Mint2")]
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_attaches_client_to_telegram_sink() -> None:
+    manager = SinkManager(  # type: ignore[arg-type]
+        _manager_cfg(event_sink_stdout=False, event_webhook_url=None, tg_forward_chats=[5])
+    )
+    client = _StubTelegramClient()
+    manager.attach_client(client)
+
+    await manager.emit(_signal(1))
+    await asyncio.sleep(0.05)
+
+    assert client.sent == [(5, "Mint")]
+    assert manager.stats()["telegram"]["detail"]["chats"]["5"]["sent"] == 1
+    await manager.aclose()
+
+
+class _BlockedBestEffortSink(_SlowSink):
+    priority = "best_effort"
+    concurrency = 1
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_spills_undelivered_events_and_replays_them(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    webhook, stdout = _SlowSink(), _BlockedBestEffortSink()
+    manager = SinkManager(_manager_cfg(), registry=_registry(webhook=[webhook], stdout=[stdout]))
+
+    stuck = asyncio.create_task(manager.emit({"message_id": "1"}))
+    await asyncio.sleep(0)
+    await manager.emit({"message_id": "2"}, critical=False)
+    await manager.emit({"message_id": "3"}, critical=False)
+    await asyncio.sleep(0)
+
+    assert not await manager.drain(0.05)
+    pending = manager.take_pending()
+    assert [(name, p["message_id"]) for name, p in pending] == [
+        ("webhook", "1"),  # lanes are only fed once critical sinks return
+        ("stdout", "2"),  # being sent
+        ("stdout", "3"),  # queued
+    ]
+    spill = Spill(tmp_path)
+    assert spill.write(pending) == 3
+    stuck.cancel()
+    await manager.aclose()
+    assert stdout.closed and webhook.closed
+
+    replay_webhook, aux = _DummySink(), _BestEffortSink()
+    restarted = SinkManager(
+        _manager_cfg(), registry=_registry(webhook=[replay_webhook], stdout=[aux])
+    )
+    assert await restarted.replay(spill.load()) == []
+    spill.replace([])
+    assert await restarted.drain(1.0)
+
+    assert replay_webhook.calls == [{"message_id": "1", "replayed": True}]
+    assert [c["message_id"] for c in aux.calls] == ["2", "3"]
+    assert not spill.path.exists()
+    await restarted.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_replay_returns_failures_and_skips_downgraded_critical() -> None:
+    webhook, aux = _FlakySink(failures=1), _BestEffortSink()
+    manager = SinkManager(_manager_cfg(), registry=_registry(webhook=[webhook], stdout=[aux]))
+    entries = [("webhook", {"message_id": "1"}), ("webhook", {"message_id": "2"})]
+
+    assert await manager.replay(entries) == [("webhook", {"message_id": "1"})]
+    assert await manager.replay([*entries, ("stdout", {"message_id": "3"})], critical=False) == []
+    assert [c["message_id"] for c in webhook.calls] == ["2"]
+    assert aux.calls == [{"message_id": "3", "replayed": True}]
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_replay_stops_at_deadline_and_lists_targets() -> None:
+    webhook, aux = _DummySink(), _BestEffortSink()
+    manager = SinkManager(_manager_cfg(), registry=_registry(webhook=[webhook], stdout=[aux]))
+    entries = [("webhook", {"message_id": "1"}), ("stdout", {"message_id": "2"})]
+
+    past = asyncio.get_running_loop().time()
+    assert await manager.replay(entries, deadline=past) == entries
+    assert webhook.calls == aux.calls == []
+    assert manager.targets() == ["webhook", "stdout"]
+    assert manager.targets(critical=False) == ["stdout"]
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sink_manager_take_pending_includes_replaced_sinks() -> None:
+    old, new = _SlowSink(), _DummySink()
+    manager = SinkManager(
+        _manager_cfg(sink_drain_timeout_ms=50), registry=_registry(webhook=[old, new])
+    )
+    stuck = asyncio.create_task(manager.emit({"message_id": "1"}))
+    await asyncio.sleep(0)
+    manager.reload(_manager_cfg(sink_drain_timeout_ms=50, event_webhook_url="https://gmgn/v2"))
+
+    assert not await manager.drain(0.01)  # the replaced sink is still sending
+    assert manager.take_pending() == [("webhook", {"message_id": "1"})]
+    stuck.cancel()
+    await manager.aclose()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any
+
+from src.telemetry import Telemetry
+
+
+def _lines(stream: io.StringIO) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_level_threshold_and_sampling() -> None:
+    out = io.StringIO()
+    rolls = iter([0.1, 0.9, 0.3, 0.7])
+    tel = Telemetry(
+        level="warning",
+        sample_rate=0.5,
+        sampled_events=["signal_event"],
+        stream=out,
+        rng=lambda: next(rolls),
+    )
+    tel.log("listening", "info", {})
+    tel.log("handler_error", "error", {"error": "boom"})
+    assert [r["event"] for r in _lines(out)] == ["handler_error"]
+    assert tel.filtered == 1
+
+    tel.configure(
+        level="info", rate_per_sec=0, burst=50, sample_rate=0.5, sampled_events=["signal_event"]
+    )
+    for i in range(4):
+        tel.log("signal_event", "info", {"message_id": i})
+    tel.log("signal_event", "error", {"message_id": 99})  # never sampled away
+    kept = [r["message_id"] for r in _lines(out) if r["event"] == "signal_event"]
+    assert kept == [0, 2, 99]
+    assert tel.sampled_out == 2
+
+
+def test_rate_limit_summarizes_suppressed_events() -> None:
+    out = io.StringIO()
+    now = [0.0]
+    tel = Telemetry(rate_per_sec=2, burst=3, stream=out, clock=lambda: now[0])
+    for i in range(10):
+        tel.log("handler_error", "error", {"i": i})
+    tel.log("client_started", "info", {})
+    assert [r.get("i") for r in _lines(out)] == [0, 1, 2, None]
+    assert tel.stats()["suppressed_pending"] == {"handler_error": 7}
+
+    assert tel.flush_suppressed() == 7
+    summary = _lines(out)[-1]
+    assert summary["event"] == "log_suppressed"
+    assert (summary["suppressed_event"], summary["count"]) == ("handler_error", 7)
+    assert tel.flush_suppressed() == 0
+
+    now[0] = 1.0  # two tokens refilled
+    for i in range(10, 15):
+        tel.log("handler_error", "error", {"i": i})
+    assert [r.get("i") for r in _lines(out)][-2:] == [10, 11]
+    assert tel.suppressed == 10
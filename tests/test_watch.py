@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.watch import FileWatcher
+
+
+def test_file_watcher_reports_changes_once(tmp_path: Path) -> None:
+    env = tmp_path / ".env"
+    env.write_text("DRY_RUN=1\n")
+    seen: list[Path] = []
+    watcher = FileWatcher([env], seen.append)
+
+    assert watcher.poll() == []
+
+    env.write_text("DRY_RUN=0\n")
+    st = env.stat()
+    os.utime(env, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert watcher.poll() == [env]
+    assert watcher.poll() == []
+
+    env.unlink()
+    assert watcher.poll() == [env]
+    assert seen == [env, env]